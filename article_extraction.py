@@ -0,0 +1,42 @@
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+EXTRACTION_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Leave a core for the API and service threads
+EXTRACTION_TIMEOUT = 30  # Seconds to wait for a worker to parse one page
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def extract_article(url, html):
+    """Parse downloaded HTML with newspaper inside a worker process, returning only plain data"""
+    import newspaper  # imported in the worker only, the service process never needs it
+    art = newspaper.Article(url)
+    art.download(input_html=html)
+    art.parse()
+    return {
+        'title': art.title,
+        'text': art.text,
+        'top_image': art.top_image,
+    }
+
+def get_extraction_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the parent runs many threads (Flask, services) that fork would copy mid-state
+            _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def extract_in_pool(url, html, timeout=EXTRACTION_TIMEOUT):
+    """Parse HTML on the process pool so CPU-bound lxml work stays off the GIL of the service process"""
+    global _pool
+    try:
+        return get_extraction_pool().submit(extract_article, url, html).result(timeout=timeout)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; drop it so the next call starts a fresh one
+        with _pool_lock:
+            _pool = None
+        raise
@@ -0,0 +1,70 @@
+"""
+Benchmark of the cluster diameter check used by HDBSCANClusteringStrategy.
+
+Compares the previous per-cluster pdist approach with clusters_exceeding_diameter
+on single large clusters, reporting wall time and peak traced memory.
+
+    python benchmarks/bench_cluster_diameter.py --sizes 1000 5000 20000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from service_ingestion import clusters_exceeding_diameter
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+PDIST_MAX_SIZE = 10000  # pdist needs n*(n-1)/2 doubles; above this it is skipped unless forced
+
+def make_cluster(size, spread, rng):
+    # Unit-norm embeddings scattered around one centre, like titles of a single story
+    centre = rng.normal(size=EMBEDDING_DIM)
+    centre /= np.linalg.norm(centre)
+    points = centre + rng.normal(scale=spread / np.sqrt(EMBEDDING_DIM), size=(size, EMBEDDING_DIM))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def pdist_check(embeddings, labels, threshold):
+    from scipy.spatial.distance import pdist
+    exceeding = []
+    for cluster in np.unique(labels):
+        if cluster == -1:
+            continue
+        if np.max(pdist(embeddings[labels == cluster])) > threshold:
+            exceeding.append(cluster)
+    return exceeding
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 5000, 10000, 20000])
+    parser.add_argument('--spread', type=float, default=0.6, help='Noise scale around the cluster centre')
+    parser.add_argument('--threshold', type=float, default=1.0)
+    parser.add_argument('--force-pdist', action='store_true', help='Run pdist even above PDIST_MAX_SIZE')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'size':>8} {'method':>12} {'seconds':>10} {'peak MB':>10} {'exceeds':>8}")
+    for size in args.sizes:
+        embeddings = make_cluster(size, args.spread, rng)
+        labels = np.zeros(size, dtype=int)
+
+        methods = [('vectorized', clusters_exceeding_diameter)]
+        if size <= PDIST_MAX_SIZE or args.force_pdist:
+            methods.append(('pdist', pdist_check))
+        for name, check in methods:
+            result, elapsed, peak = measure(lambda: check(embeddings, labels, args.threshold))
+            print(f"{size:>8} {name:>12} {elapsed:>10.3f} {peak / 2**20:>10.1f} {str(bool(len(result))):>8}")
+
+if __name__ == '__main__':
+    main()
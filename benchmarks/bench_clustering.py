@@ -0,0 +1,218 @@
+"""
+Clustering benchmark suite on synthetic corpora.
+
+Times each stage of cluster_articles / HDBSCANClusteringStrategy.cluster separately
+(encoding, vector-store insert, HDBSCAN fit, the diameter check both vectorized and with
+the original per-cluster pdist, and DB persistence) and records wall time and peak RSS
+per stage. Everything runs offline against temporary files; the app database is never
+touched. Results are written as JSON so runs can be compared across changes.
+
+    python benchmarks/bench_clustering.py --sizes 1000 10000 100000
+    python benchmarks/bench_clustering.py --encoder model   # real model from the local cache
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from common import db, Article, Topic
+from vector_store import VectorStore
+from service_ingestion import HDBSCANClusteringStrategy, clusters_exceeding_diameter
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+DIAMETER_THRESHOLD = 1.0  # Same limit HDBSCANClusteringStrategy imposes
+RSS_SAMPLE_INTERVAL = 0.01  # Seconds between RSS samples while a stage runs
+PDIST_MAX_CLUSTER = 20000  # Larger clusters are skipped by the pdist stage to avoid exhausting RAM
+WORDS = ('storm', 'election', 'market', 'court', 'vote', 'fire', 'talks', 'strike', 'border', 'league',
+         'summit', 'budget', 'flood', 'trial', 'deal', 'protest', 'launch', 'ceasefire', 'record', 'inquiry')
+
+def current_rss():
+    # Resident set size from /proc on Linux; elsewhere fall back to the process high-water mark
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def run_stage(results, name, fn):
+    """Run fn while sampling RSS on a background thread; record seconds and peak RSS for the stage"""
+    peak = current_rss()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(RSS_SAMPLE_INTERVAL):
+            peak = max(peak, current_rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    baseline = peak
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        value = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+    peak = max(peak, current_rss())
+    results[name] = {
+        'seconds': round(elapsed, 4),
+        'peak_rss_mb': round(peak / 2**20, 1),
+        'peak_rss_delta_mb': round((peak - baseline) / 2**20, 1),
+    }
+    print(f"  {name:<22} {elapsed:>9.3f}s  peak RSS {peak / 2**20:>8.1f} MB (+{(peak - baseline) / 2**20:.1f})")
+    return value
+
+def synthetic_corpus(size, rng, noise_fraction=0.2):
+    """Titles and matching embeddings: stories of a few articles each plus unrelated noise articles"""
+    stories = max(1, int(size * (1 - noise_fraction) / 5))
+    story_of = np.where(rng.random(size) < noise_fraction, -1, rng.integers(stories, size=size))
+    centres = rng.normal(size=(stories, EMBEDDING_DIM))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+
+    titles, vectors = [], np.empty((size, EMBEDDING_DIM), dtype=np.float32)
+    for i, story in enumerate(story_of):
+        if story == -1:
+            words = rng.choice(WORDS, size=6)
+            vector = rng.normal(size=EMBEDDING_DIM)
+        else:
+            story_rng = np.random.default_rng(int(story))
+            words = list(story_rng.choice(WORDS, size=4)) + list(rng.choice(WORDS, size=2))
+            vector = centres[story] + rng.normal(scale=0.15 / np.sqrt(EMBEDDING_DIM), size=EMBEDDING_DIM)
+        titles.append(' '.join(words).capitalize() + f" {i}")
+        vectors[i] = vector / np.linalg.norm(vector)
+    return titles, vectors
+
+def encode_stage(encoder, titles, vectors, batch_size):
+    if encoder == 'model':
+        from sentence_transformers import SentenceTransformer
+        # HF_HUB_OFFLINE keeps the run offline; the model must already be in the local cache
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+        return model.encode(titles, batch_size=batch_size, convert_to_numpy=True).astype(np.float32)
+    # Random mode: the precomputed synthetic vectors stand in for the model output
+    return np.array(vectors)
+
+def insert_stage(store, vectors, batch_size):
+    for start in range(0, len(vectors), batch_size):
+        store.add(range(start + 1, start + 1 + len(vectors[start:start + batch_size])), vectors[start:start + batch_size])
+    return store.get()
+
+def hdbscan_stage(embeddings):
+    from sklearn.cluster import HDBSCAN
+    hdb = HDBSCAN(min_cluster_size=2)
+    hdb.fit(embeddings)
+    return hdb.labels_
+
+def pdist_stage(embeddings, labels):
+    from scipy.spatial.distance import pdist
+    exceeding, skipped = [], 0
+    for cluster in np.unique(labels):
+        if cluster == -1:
+            continue
+        points = embeddings[labels == cluster]
+        if len(points) > PDIST_MAX_CLUSTER:
+            skipped += 1
+            continue
+        if np.max(pdist(points)) > DIAMETER_THRESHOLD:
+            exceeding.append(cluster)
+    return exceeding, skipped
+
+def persistence_stage(db_file, titles, labels):
+    engine = create_engine(f'sqlite:///{db_file}')
+    db.metadata.create_all(engine, tables=[Topic.__table__, Article.__table__])
+    with Session(engine) as session:
+        session.execute(Article.__table__.insert(), [
+            {'id': i + 1, 'title': title, 'url': f'https://example.com/{i}', 'processed': False}
+            for i, title in enumerate(titles)
+        ])
+        session.commit()
+        # The same statements HDBSCANClusteringStrategy issues, against the temporary database
+        strategy = HDBSCANClusteringStrategy(SimpleNamespace(session=session), None)
+        return strategy._persist_labels(list(range(1, len(titles) + 1)), labels)
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--encoder', choices=['random', 'model'], default='random',
+                        help='random uses synthetic embeddings; model runs all-MiniLM-L6-v2 from the local cache')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per vector store append and encode batch')
+    parser.add_argument('--store-dtype', default='float32', help='Vector store precision (float32, float16, int8)')
+    parser.add_argument('--skip-pdist', action='store_true', help='Skip the original per-cluster pdist check')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='JSON output path (default: benchmarks/results/clustering-<timestamp>.json)')
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    report = {
+        'benchmark': 'clustering',
+        'started_at': started.isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+        'runs': [],
+    }
+
+    for size in args.sizes:
+        print(f"{size} articles")
+        rng = np.random.default_rng(args.seed)
+        titles, vectors = synthetic_corpus(size, rng)
+        stages = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            embeddings = run_stage(stages, 'encode', lambda: encode_stage(args.encoder, titles, vectors, args.batch_size))
+            store = VectorStore(os.path.join(workdir, 'vectors'), dtype=args.store_dtype)
+            _, stored = run_stage(stages, 'vector_store_insert', lambda: insert_stage(store, embeddings, args.batch_size))
+            embeddings = np.asarray(stored, dtype=np.float32)
+
+            labels = run_stage(stages, 'hdbscan_fit', lambda: hdbscan_stage(embeddings))
+            exceeding = run_stage(stages, 'diameter_vectorized',
+                                  lambda: clusters_exceeding_diameter(embeddings, labels, DIAMETER_THRESHOLD))
+            if not args.skip_pdist:
+                _, skipped = run_stage(stages, 'diameter_pdist', lambda: pdist_stage(embeddings, labels))
+                stages['diameter_pdist']['clusters_skipped'] = skipped
+
+            labels = labels.copy()
+            for cluster in exceeding:
+                labels[labels == cluster] = -1
+            topics = run_stage(stages, 'db_persistence',
+                               lambda: persistence_stage(os.path.join(workdir, 'bench.db'), titles, labels))
+
+        report['runs'].append({
+            'articles': size,
+            'clusters': int(len(np.unique(labels[labels != -1]))),
+            'noise': int(np.sum(labels == -1)),
+            'topics_created': len(topics),
+            'stages': stages,
+        })
+
+    output = args.output or os.path.join(REPO_ROOT, 'benchmarks', 'results', f"clustering-{started.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
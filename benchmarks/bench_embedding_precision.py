@@ -0,0 +1,74 @@
+"""
+Accuracy versus memory trade-off of the vector store precisions (float32, float16, int8).
+
+Round-trips embeddings through a VectorStore of each precision and reports bytes per
+vector, the error in pairwise euclidean distances, and how often the clustering
+thresholds (the 1.0 cluster diameter limit and NEAREST_TOPIC_MAX_DISTANCE) decide a
+pair differently than with float32.
+
+    python benchmarks/bench_embedding_precision.py --count 5000
+    python benchmarks/bench_embedding_precision.py --from-cache   # real cached title embeddings
+"""
+import argparse
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vector_store import VectorStore, STORAGE_DTYPES
+from service_ingestion import NEAREST_TOPIC_MAX_DISTANCE
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+DIAMETER_THRESHOLD = 1.0  # HDBSCANClusteringStrategy max cluster diameter
+
+def synthetic_embeddings(count, rng, clusters=20):
+    # Unit vectors around a few centres with varying spread, so same-cluster distances cover both thresholds
+    centres = rng.normal(size=(clusters, EMBEDDING_DIM)) / np.sqrt(EMBEDDING_DIM)
+    spread = rng.uniform(0.1, 0.8, size=(count, 1))
+    points = centres[rng.integers(clusters, size=count)] + rng.normal(size=(count, EMBEDDING_DIM)) * spread / np.sqrt(EMBEDDING_DIM)
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+def cached_embeddings(count):
+    from common import app, db, CachedEmbedding
+    from embeddings import EMBEDDING_CACHE_DTYPE
+    with app.app_context():
+        rows = db.session.query(CachedEmbedding.vector).limit(count).all()
+    return np.stack([np.frombuffer(row.vector, dtype=EMBEDDING_CACHE_DTYPE).astype(np.float32) for row in rows])
+
+def pair_distances(vectors, pairs):
+    return np.linalg.norm(vectors[pairs[:, 0]] - vectors[pairs[:, 1]], axis=1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--pairs', type=int, default=200000)
+    parser.add_argument('--from-cache', action='store_true', help='Use embeddings from the cached_embedding table')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = cached_embeddings(args.count) if args.from_cache else synthetic_embeddings(args.count, rng)
+    pairs = rng.integers(len(vectors), size=(args.pairs, 2))
+    reference = pair_distances(vectors, pairs)
+
+    print(f"{len(vectors)} vectors of dim {vectors.shape[1]}, {args.pairs} random pairs")
+    for threshold in (DIAMETER_THRESHOLD, NEAREST_TOPIC_MAX_DISTANCE):
+        print(f"pairs within 0.01 of threshold {threshold}: {np.sum(np.abs(reference - threshold) < 0.01)}")
+    print(f"{'dtype':>8} {'bytes/vec':>10} {'MB/100k':>8} {'max |dd|':>10} {'mean |dd|':>10} "
+          f"{'flips@' + str(DIAMETER_THRESHOLD):>11} {'flips@' + str(NEAREST_TOPIC_MAX_DISTANCE):>11}")
+    for dtype in STORAGE_DTYPES:
+        with tempfile.TemporaryDirectory() as path:
+            store = VectorStore(path, dtype=dtype)
+            store.add(range(len(vectors)), vectors)
+            _, stored = store.get()
+            restored = np.asarray(stored, dtype=np.float32)
+            bytes_per_vector = store.nbytes() / len(store)
+
+        distances = pair_distances(restored, pairs)
+        errors = np.abs(distances - reference)
+        flips = [np.mean((reference <= t) != (distances <= t)) for t in (DIAMETER_THRESHOLD, NEAREST_TOPIC_MAX_DISTANCE)]
+        print(f"{dtype:>8} {bytes_per_vector:>10.0f} {bytes_per_vector * 1e5 / 2**20:>8.1f} {errors.max():>10.2e} "
+              f"{errors.mean():>10.2e} {flips[0]:>11.2e} {flips[1]:>11.2e}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Near-duplicate detection benchmark.
+
+Builds a corpus of real English passages from the docstrings of the Python standard library
+(no network or app database needed), then measures for each detector:
+
+- recall: how often an edited copy of a passage (k random word substitutions plus a
+  syndication dateline) is matched back to its original, at full-article and RSS-summary lengths;
+- false positives: how often distinct passages of the same length are matched to each other
+  (docstrings contain some genuinely repeated boilerplate, so this is an upper bound).
+
+The MinHash/LSH detector in near_duplicates.py is compared against the previous SimHash
+settings (3-word shingles, 64 bits, at most 3 differing bits), reimplemented here.
+
+    python benchmarks/bench_near_duplicates.py
+    python benchmarks/bench_near_duplicates.py --lengths 400 40 --edits 1 2 5 10 --trials 300
+"""
+import argparse
+import hashlib
+import json
+import os
+import importlib.util
+import platform
+import random
+import subprocess
+import sysconfig
+import sys
+import warnings
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from near_duplicates import MinHashIndex, minhash, TOKEN_RE
+
+SIMHASH_BITS = 64
+SIMHASH_SHINGLE_SIZE = 3  # Previous SimHash settings, kept as the baseline
+SIMHASH_MAX_DISTANCE = 3
+DATELINE = 'LONDON (Reuters) - '
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+
+def simhash(tokens):
+    weights = [0] * SIMHASH_BITS
+    for i in range(len(tokens) - SIMHASH_SHINGLE_SIZE + 1):
+        shingle = ' '.join(tokens[i:i + SIMHASH_SHINGLE_SIZE])
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def docstring_tokens():
+    """All words of the distinct docstrings of importable stdlib modules, in module order"""
+    tokens, seen = [], set()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in sorted(sys.stdlib_module_names):
+            if name.startswith('_') or name in ('antigravity', 'this', 'idlelib', 'tkinter', 'turtle'):
+                continue
+            try:
+                # Only modules that resolve inside the stdlib, never same-named files on sys.path
+                spec = importlib.util.find_spec(name)
+                if spec is None or (spec.origin not in ('built-in', 'frozen') and not spec.origin.startswith(STDLIB_DIR)):
+                    continue
+                module = importlib.import_module(name)
+            except Exception:
+                continue
+            for obj in [module] + list(vars(module).values()):
+                doc = getattr(obj, '__doc__', None)
+                if isinstance(doc, str) and doc not in seen and getattr(obj, '__module__', name) == name:
+                    seen.add(doc)
+                    tokens.extend(TOKEN_RE.findall(doc.lower()))
+    return tokens
+
+def passages(tokens, length, count, rng):
+    """Non-overlapping passages of the given length, sampled from the corpus"""
+    starts = list(range(0, len(tokens) - length, length))
+    rng.shuffle(starts)
+    return [tokens[s:s + length] for s in starts[:count]]
+
+def edited(passage, edits, vocabulary, rng):
+    copy = list(passage)
+    for position in rng.sample(range(len(copy)), min(edits, len(copy))):
+        copy[position] = rng.choice(vocabulary)
+    return TOKEN_RE.findall(DATELINE.lower()) + copy
+
+def measure_minhash(originals, copies, others):
+    index = MinHashIndex()
+    for i, passage in enumerate(originals):
+        index.add(i, minhash(' '.join(passage)))
+    matched = sum(index.find(minhash(' '.join(copy))) == i for i, copy in enumerate(copies))
+    false = sum(index.find(minhash(' '.join(other))) is not None for other in others)
+    return matched, false
+
+def measure_simhash(originals, copies, others):
+    fingerprints = [simhash(passage) for passage in originals]
+
+    def find(tokens):
+        fingerprint = simhash(tokens)
+        distances = [bin(fingerprint ^ f).count('1') for f in fingerprints]
+        best = min(range(len(distances)), key=distances.__getitem__)
+        return best if distances[best] <= SIMHASH_MAX_DISTANCE else None
+
+    matched = sum(find(copy) == i for i, copy in enumerate(copies))
+    false = sum(find(other) is not None for other in others)
+    return matched, false
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=[400, 40], help='Passage lengths in words')
+    parser.add_argument('--edits', type=int, nargs='+', default=[1, 2, 5, 10], help='Word substitutions per copy')
+    parser.add_argument('--trials', type=int, default=300, help='Max originals (and unrelated probes) per length')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='JSON output path (default: benchmarks/results/near-duplicates-<timestamp>.json)')
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    report = {
+        'benchmark': 'near_duplicates',
+        'started_at': started.isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': vars(args),
+        'runs': [],
+    }
+
+    tokens = docstring_tokens()
+    vocabulary = sorted(set(tokens))
+    print(f"Corpus: {len(tokens)} words, {len(vocabulary)} distinct")
+
+    for length in args.lengths:
+        rng = random.Random(args.seed)
+        # Short corpora are split evenly between originals and unrelated probes
+        sample = passages(tokens, length, 2 * args.trials, rng)
+        originals, others = sample[:len(sample) // 2], sample[len(sample) // 2:]
+        for edits in args.edits:
+            copies = [edited(passage, edits, vocabulary, rng) for passage in originals]
+            run = {'length': length, 'edits': edits, 'originals': len(originals), 'unrelated': len(others)}
+            for name, measure in (('minhash', measure_minhash), ('simhash', measure_simhash)):
+                matched, false = measure(originals, copies, others)
+                run[name] = {'recall': round(matched / len(originals), 3), 'false_positive_rate': round(false / len(others), 4)}
+            report['runs'].append(run)
+            print(f"  {length:>4} words, {edits:>2} edits: "
+                  f"minhash recall {run['minhash']['recall']:.3f} fp {run['minhash']['false_positive_rate']:.4f} | "
+                  f"simhash recall {run['simhash']['recall']:.3f} fp {run['simhash']['false_positive_rate']:.4f}")
+
+    output = args.output or os.path.join(REPO_ROOT, 'benchmarks', 'results', f"near-duplicates-{started.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
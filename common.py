@@ -2,7 +2,9 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import inspect, text
+from datetime import datetime, timezone
+import hashlib
 import os
 import logging
 
@@ -21,28 +23,37 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 os.makedirs(app.instance_path, exist_ok=True)
+ARTICLE_CANONICAL_URL_INDEX = 'ix_article_canonical_url'  # unique canonical_url index
 # Defining the Article model (table) to store news articles
 class Article(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255))
-    url = db.Column(db.String(255), unique=True)
+    url = db.Column(db.String(255), unique=True)  # link as published, shown to users
+    # url without tracking parameters or AMP variants; unique, so concurrent ingestors cannot store one story twice.
+    # Rows stored before it existed, and later duplicates found when it became unique, have none
+    canonical_url = db.Column(db.String(255), unique=True, index=True)
     published_at = db.Column(db.DateTime)
     content = db.Column(db.Text)
     processed = db.Column(db.Boolean, default=False)
     topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'))
     multimedia = db.Column(db.Text)
+    minhash = db.Column(db.LargeBinary)  # MinHash signature of the content's word shingles
+    duplicate_of = db.Column(db.Integer, db.ForeignKey('article.id'))  # set on near-duplicates of an earlier article
 
 # Defining the Topic model (table) to store topics/categories of articles
 class Topic(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    merged_into = db.Column(db.Integer, db.ForeignKey('topic.id'))  # set when the topic was merged into an older one covering the same story
     #articles = db.relationship('Article', secondary='articles_topics')
 
 # Defining the Ranking model (table) to rank topics
 class Ranking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    content_hash = db.Column(db.String(40))  # hash of the ordered topic IDs, used to skip unchanged rankings
+    refreshed_at = db.Column(db.DateTime)  # last time the same ranking was confirmed
     topics = db.relationship('Topic', secondary='rankings_topics')
 
 # Defining a linking table between Rankings and Topics
@@ -60,14 +71,46 @@ class Insight(db.Model):
     content = db.Column(db.Text)
     insight_type = db.Column(db.String(50))
 
+SOCIAL_POST_HASH_INDEX = 'ix_social_media_post_topic_hash'  # unique (topic_id, content_hash) index
+
 # Defining the SocialMediaPost model (table) to store social media posts about topics
 class SocialMediaPost(db.Model):
+    __table_args__ = (db.Index(SOCIAL_POST_HASH_INDEX, 'topic_id', 'content_hash', unique=True),)
     id = db.Column(db.Integer, primary_key=True)
     topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'))
     content = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     views = db.Column(db.Integer)
     likes = db.Column(db.Integer)
+    content_hash = db.Column(db.String(40))  # social_post_hash of content and created_at, unique per topic
+
+
+# Identity of a social post for deduplication: its text and creation time, with the time taken as UTC
+def social_post_hash(content, created_at):
+    if created_at is not None and created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    created = created_at.isoformat() if created_at is not None else ''
+    return hashlib.sha1(f"{created}\0{content or ''}".encode('utf-8')).hexdigest()
+
+# Defining the FeedValidator model (table) to store per-feed HTTP cache validators for conditional GETs
+class FeedValidator(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    feed_url = db.Column(db.String(255), unique=True)
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(255))
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Defining the CachedEmbedding model (table) to store embeddings keyed by a hash of model name and text
+class CachedEmbedding(db.Model):
+    key = db.Column(db.String(64), primary_key=True)
+    vector = db.Column(db.LargeBinary)
+
+# Defining the TopicCentroid model (table) to store each topic's mean embedding and article count
+class TopicCentroid(db.Model):
+    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), primary_key=True)
+    centroid = db.Column(db.LargeBinary)  # float32 vector
+    article_count = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 # class ArticlesTopics(db.Model):
 #     __tablename__ = 'articles_topics'
@@ -81,5 +124,81 @@ def init_database():
         db.create_all()
         logger.info("Database initialized successfully!")
 
+# Columns added to existing tables after their first release, as (table, column, SQL type)
+ADDED_COLUMNS = [
+    ('article', 'minhash', 'BLOB'),
+    ('article', 'duplicate_of', 'INTEGER REFERENCES article(id)'),
+    ('article', 'canonical_url', 'VARCHAR(255)'),
+    ('topic', 'merged_into', 'INTEGER REFERENCES topic(id)'),
+    ('ranking', 'content_hash', 'VARCHAR(40)'),
+    ('ranking', 'refreshed_at', 'DATETIME'),
+    ('social_media_post', 'content_hash', 'VARCHAR(40)'),
+]
+
+# Function to bring an existing database up to date with the current models
+def migrate_database():
+    with app.app_context():
+        # create_all only creates tables that are missing, existing data is left untouched
+        db.create_all()
+        inspector = inspect(db.engine)
+        for table, column, column_type in ADDED_COLUMNS:
+            existing = {c['name'] for c in inspector.get_columns(table)}
+            if column not in existing:
+                db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}'))
+                logger.info(f"Added column {table}.{column}")
+        db.session.commit()
+        _index_article_canonical_urls(inspector)
+        _index_social_post_hashes(inspector)
+        logger.info("Database schema is up to date.")
+
+# Makes canonical_url unique, keeping it on the first article of each story; create_all only indexes tables it creates
+def _index_article_canonical_urls(inspector):
+    index = {index['name']: index for index in inspector.get_indexes('article')}.get(ARTICLE_CANONICAL_URL_INDEX)
+    if index is not None and index['unique']:
+        return
+    # Copies stored before the index was unique keep their url; only the later ones lose the canonical_url
+    cleared = db.session.execute(text(
+        "UPDATE article SET canonical_url = NULL WHERE canonical_url IS NOT NULL AND id NOT IN "
+        "(SELECT MIN(id) FROM article WHERE canonical_url IS NOT NULL GROUP BY canonical_url)"
+    )).rowcount
+    db.session.execute(text(f"DROP INDEX IF EXISTS {ARTICLE_CANONICAL_URL_INDEX}"))
+    db.session.execute(text(f"CREATE UNIQUE INDEX {ARTICLE_CANONICAL_URL_INDEX} ON article (canonical_url)"))
+    db.session.commit()
+    logger.info(f"Created unique index {ARTICLE_CANONICAL_URL_INDEX}, cleared {cleared} duplicate canonical URLs")
+
+# Backfills social post hashes, drops the duplicates they reveal and adds the unique index they rely on
+def _index_social_post_hashes(inspector):
+    rows = db.session.execute(text(
+        "SELECT id, topic_id, content, created_at FROM social_media_post WHERE content_hash IS NULL ORDER BY id"
+    )).fetchall()
+    if rows:
+        seen = {row.topic_id: set() for row in rows}
+        for topic_id, content_hash in db.session.execute(text(
+            "SELECT topic_id, content_hash FROM social_media_post WHERE content_hash IS NOT NULL"
+        )).fetchall():
+            seen.setdefault(topic_id, set()).add(content_hash)
+        hashes, duplicates = [], []
+        for row in rows:
+            created_at = datetime.fromisoformat(row.created_at) if row.created_at else None
+            content_hash = social_post_hash(row.content, created_at)
+            if content_hash in seen[row.topic_id]:
+                duplicates.append({'post_id': row.id})
+            else:
+                seen[row.topic_id].add(content_hash)
+                hashes.append({'post_id': row.id, 'content_hash': content_hash})
+        if duplicates:
+            db.session.execute(text("DELETE FROM social_media_post WHERE id = :post_id"), duplicates)
+        if hashes:
+            db.session.execute(text("UPDATE social_media_post SET content_hash = :content_hash WHERE id = :post_id"), hashes)
+        db.session.commit()
+        logger.info(f"Hashed {len(hashes)} social media posts and removed {len(duplicates)} duplicates")
+
+    if SOCIAL_POST_HASH_INDEX not in {index['name'] for index in inspector.get_indexes('social_media_post')}:
+        db.session.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {SOCIAL_POST_HASH_INDEX} ON social_media_post (topic_id, content_hash)"
+        ))
+        db.session.commit()
+        logger.info(f"Created index {SOCIAL_POST_HASH_INDEX}")
+
 if __name__ == '__main__':
     print("App and db defined:", app, db)
@@ -0,0 +1,77 @@
+from common import app, db, logger, CachedEmbedding
+import hashlib
+import os
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from model_registry import get_sentence_transformer
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))  # Texts per encoder forward pass
+EMBEDDING_CACHE_DTYPE = np.float16  # Storage precision of cached vectors; they are returned as float32
+# Encoding is sharded across worker processes when at least this many texts miss the cache (large backfills);
+# smaller batches stay in-process because starting the pool costs a model load per worker
+EMBEDDING_MULTI_PROCESS_MIN = int(os.getenv("EMBEDDING_MULTI_PROCESS_MIN", "2000"))
+EMBEDDING_ENCODE_PROCESSES = int(os.getenv("EMBEDDING_ENCODE_PROCESSES", str(os.cpu_count() or 1)))
+CACHE_IN_CHUNK_SIZE = 500  # Keys per IN query, below SQLite's bound-parameter limit
+
+def embedding_key(model_name, text):
+    """Content address of an embedding: the same model and text always map to the same key"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+def _load_cached(keys):
+    cached = {}
+    for i in range(0, len(keys), CACHE_IN_CHUNK_SIZE):
+        chunk = keys[i:i + CACHE_IN_CHUNK_SIZE]
+        rows = db.session.execute(
+            select(CachedEmbedding.key, CachedEmbedding.vector).where(CachedEmbedding.key.in_(chunk))
+        ).fetchall()
+        for row in rows:
+            cached[row.key] = np.frombuffer(row.vector, dtype=EMBEDDING_CACHE_DTYPE).astype(np.float32)
+    return cached
+
+def _store(vectors_by_key):
+    rows = [
+        {'key': key, 'vector': vector.astype(EMBEDDING_CACHE_DTYPE).tobytes()}
+        for key, vector in vectors_by_key.items()
+    ]
+    db.session.execute(sqlite_insert(CachedEmbedding).on_conflict_do_nothing(index_elements=['key']), rows)
+    db.session.commit()
+
+def _encode(model, texts, batch_size):
+    if EMBEDDING_ENCODE_PROCESSES > 1 and len(texts) >= EMBEDDING_MULTI_PROCESS_MIN:
+        logger.info(f"Encoding {len(texts)} texts on {EMBEDDING_ENCODE_PROCESSES} worker processes")
+        pool = model.start_multi_process_pool(target_devices=['cpu'] * EMBEDDING_ENCODE_PROCESSES)
+        try:
+            return model.encode_multi_process(texts, pool, batch_size=batch_size)
+        finally:
+            model.stop_multi_process_pool(pool)
+    return model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+def encode_cached(texts, model_name=EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Encode texts into a float32 matrix, calling the model only for texts whose
+    embedding is not already in the persistent cache.
+    """
+    keys = [embedding_key(model_name, text) for text in texts]
+    with app.app_context():
+        cached = _load_cached(list(set(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        if missing:
+            model = get_sentence_transformer(model_name)
+            encoded = _encode(model, list(missing.values()), batch_size)
+            new_vectors = dict(zip(missing.keys(), encoded))
+            _store(new_vectors)
+            # Round-trip through the storage dtype so hits and misses return identical values
+            for key, vector in new_vectors.items():
+                cached[key] = vector.astype(EMBEDDING_CACHE_DTYPE).astype(np.float32)
+
+    logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} encoded")
+    if not keys:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([cached[key] for key in keys])
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+FETCH_MAX_WORKERS = 16  # Global cap on concurrent outbound requests
+FETCH_PER_HOST_LIMIT = 4  # Max concurrent requests against a single host
+FETCH_TIMEOUT = 10  # Seconds allowed per request (connect and read)
+FETCH_USER_AGENT = 'Mozilla/5.0 (compatible; InsiteNewsBot/1.0)'
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # Responses retried when a pool is created with retries
+RETRY_BACKOFF = 0.5  # Seconds before the first retry, doubling on each further attempt; Retry-After takes precedence
+RETRY_AFTER_MAX = 30  # Longest Retry-After (seconds) honoured; a longer one returns the response instead of sleeping
+
+# Retry policy that gives up instead of sleeping when a server asks for a wait longer than RETRY_AFTER_MAX.
+# The request timeout does not cover sleeps between retries, so an uncapped Retry-After could stall a caller indefinitely.
+class CappedRetry(Retry):
+    max_retry_after = RETRY_AFTER_MAX
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry_after = self.get_retry_after(response) if response is not None else None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            # With raise_on_status=False urllib3 returns the response, so callers see the 429/503 status
+            raise MaxRetryError(_pool, url, f"Retry-After of {retry_after:.0f}s exceeds {self.max_retry_after}s")
+        return super().increment(method, url, response=response, error=error, _pool=_pool, _stacktrace=_stacktrace)
+
+# Bounded-parallel HTTP fetcher shared by the ingestion strategies
+class FetchPool:
+
+    def __init__(self, max_workers=FETCH_MAX_WORKERS, per_host_limit=FETCH_PER_HOST_LIMIT, timeout=FETCH_TIMEOUT, retries=0):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+        # The global semaphore caps in-flight requests across every caller sharing this pool
+        self._global_limit = threading.BoundedSemaphore(max_workers)
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': FETCH_USER_AGENT})
+        # With retries, rate-limited and failed requests are retried with exponential backoff;
+        # the last response is returned rather than raised so callers still see its status code,
+        # and a Retry-After beyond RETRY_AFTER_MAX returns the response at once
+        retry = CappedRetry(
+            total=retries, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']), respect_retry_after_header=True, raise_on_status=False
+        ) if retries else 0
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def get(self, url, **kwargs):
+        """GET a URL while holding both the per-host and the global slot"""
+        kwargs.setdefault('timeout', self.timeout)
+        # The host slot is taken first, so requests queued behind a busy host never hold global slots
+        with self._host_limit(url), self._global_limit:
+            return self.session.get(url, **kwargs)
+
+    def map_unordered(self, fn, items):
+        """
+        Run fn over items concurrently, yielding (item, result, error) tuples
+        in completion order so slow items never hold up fast ones.
+        """
+        items = list(items)
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            futures = {executor.submit(fn, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
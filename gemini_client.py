@@ -5,7 +5,6 @@ from dotenv import load_dotenv
 import logging
 import time
 import threading
-import ollama
 
 # Loading environment variables from a .env file
 load_dotenv()
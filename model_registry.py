@@ -0,0 +1,47 @@
+from common import logger
+import threading
+import time
+
+# Process-wide registry of heavy models: each one is loaded on first use and shared by every service
+_instances = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+def get_model(name, loader):
+    """Return the shared instance registered under name, calling loader() the first time only"""
+    with _registry_lock:
+        if name in _instances:
+            return _instances[name]
+        lock = _locks.setdefault(name, threading.Lock())
+
+    # Loading happens outside the registry lock so one slow model does not block the others
+    with lock:
+        if name not in _instances:
+            start = time.time()
+            _instances[name] = loader()
+            logger.info(f"Loaded {name} in {time.time() - start:.1f} seconds")
+    return _instances[name]
+
+def get_spacy_nlp():
+    def load():
+        import spacy
+        return spacy.load("en_core_web_sm")
+    return get_model("spacy:en_core_web_sm", load)
+
+def get_sentence_transformer(model_name):
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return get_model(f"sentence_transformer:{model_name}", load)
+
+def get_chroma_client():
+    def load():
+        import chromadb
+        return chromadb.Client()
+    return get_model("chromadb", load)
+
+def get_vector_store():
+    def load():
+        from vector_store import VectorStore
+        return VectorStore()
+    return get_model("vector_store", load)
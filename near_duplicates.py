@@ -0,0 +1,101 @@
+import hashlib
+import re
+import threading
+import numpy as np
+
+NUM_PERMUTATIONS = 128  # MinHash signature length
+SHINGLE_SIZE = 3  # Words per shingle
+NEAR_DUPLICATE_MIN_JACCARD = 0.5  # Min estimated shingle Jaccard similarity for two articles to count as near-duplicates
+NEAR_DUPLICATE_MIN_TOKENS = 12  # Shorter texts (e.g. bare headlines) share too few shingles to compare reliably
+# Bands for LSH; 32 bands of 4 rows make pairs at Jaccard 0.5 candidates with probability ~0.87 and at 0.7 ~0.9998
+LSH_BANDS = 32
+BAND_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+TAG_RE = re.compile(r'<[^>]+>')
+TOKEN_RE = re.compile(r'\w+')
+
+# Fixed multiply-shift hash parameters so signatures stay comparable across restarts
+_rng = np.random.default_rng(582)
+_MULTIPLIERS = _rng.integers(1, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+def minhash(text):
+    """
+    Compute a MinHash signature (uint32 array of NUM_PERMUTATIONS) of text's word shingles.
+    Returns None when the text is too short to compare.
+    """
+    tokens = TOKEN_RE.findall(TAG_RE.sub(' ', text or '').lower())
+    if len(tokens) < NEAR_DUPLICATE_MIN_TOKENS:
+        return None
+
+    shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'big') for s in shingles),
+        dtype=np.uint64, count=len(shingles),
+    )
+    # Multiply-shift hashing wraps modulo 2**64; the top 32 bits are the permuted value
+    permuted = (_MULTIPLIERS[:, None] * hashes[None, :] + _OFFSETS[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+def to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+def from_bytes(value):
+    return np.frombuffer(value, dtype='<u4')
+
+def jaccard(a, b):
+    """Estimate the Jaccard similarity of two shingle sets from their signatures"""
+    return float(np.mean(a == b))
+
+# LSH index over MinHash signatures, bucketing each one by its bands
+class MinHashIndex:
+    def __init__(self, min_jaccard=NEAR_DUPLICATE_MIN_JACCARD):
+        self.min_jaccard = min_jaccard
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bands(signature):
+        return [signature[band * BAND_ROWS:(band + 1) * BAND_ROWS].tobytes() for band in range(LSH_BANDS)]
+
+    def add(self, article_id, signature, published_at=None):
+        """Index an article; entries with a published_at can later be expired, those without never are"""
+        with self._lock:
+            for band, key in enumerate(self._bands(signature)):
+                self._buckets[band].setdefault(key, []).append((article_id, signature, published_at))
+
+    def find(self, signature, not_before=None):
+        """
+        Return the ID of the most similar indexed article at or above min_jaccard, or None.
+        Articles published before not_before are ignored even if they have not been expired yet.
+        """
+        best_id, best_similarity = None, self.min_jaccard
+        seen = set()
+        with self._lock:
+            for band, key in enumerate(self._bands(signature)):
+                for article_id, candidate, published_at in self._buckets[band].get(key, ()):
+                    if article_id in seen:
+                        continue
+                    seen.add(article_id)
+                    if not_before is not None and published_at is not None and published_at < not_before:
+                        continue
+                    similarity = jaccard(signature, candidate)
+                    if similarity >= best_similarity:
+                        best_id, best_similarity = article_id, similarity
+        return best_id
+
+    def expire(self, cutoff):
+        """Drop every entry published before cutoff and return how many articles were removed"""
+        before = len(self)
+        with self._lock:
+            for buckets in self._buckets:
+                for key in list(buckets):
+                    kept = [entry for entry in buckets[key] if entry[2] is None or entry[2] >= cutoff]
+                    if kept:
+                        buckets[key] = kept
+                    else:
+                        del buckets[key]
+        return before - len(self)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._buckets[0].values())
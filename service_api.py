@@ -2,12 +2,11 @@ from common import app, Ranking, Insight, SocialMediaPost, Article
 from service_diversity import calculate_diversity_score
 import json
 from flask import jsonify
+from sqlalchemy import func
 from datetime import datetime, timedelta
-import spacy
 import time
 from service_ranking import RANK_INTERVAL
-
-nlp = spacy.load("en_core_web_sm")
+from model_registry import get_spacy_nlp
 
 # Defining an endpoint to retrieve the latest ranking of topics
 @app.route('/topics')
@@ -26,7 +25,8 @@ def get_top_topics():
 def get_next_update_time():
     latest_ranking = Ranking.query.order_by(Ranking.created_at.desc()).first()
     if latest_ranking:
-        last_update_time = latest_ranking.created_at
+        # An unchanged ranking is confirmed in place rather than rewritten
+        last_update_time = latest_ranking.refreshed_at or latest_ranking.created_at
         next_update_time = last_update_time + timedelta(seconds=RANK_INTERVAL)
         current_time = datetime.utcnow()
         
@@ -51,11 +51,14 @@ def get_next_update_time():
 def get_ranking_history():
     # Get rankings from the last hour
     one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-    rankings = Ranking.query.filter(Ranking.created_at >= one_hour_ago).order_by(Ranking.created_at.desc()).all()
+    rankings = Ranking.query.filter(
+        func.coalesce(Ranking.refreshed_at, Ranking.created_at) >= one_hour_ago
+    ).order_by(Ranking.created_at.desc()).all()
     
     return jsonify([{
         'id': ranking.id,
         'created_at': ranking.created_at.isoformat(),
+        'refreshed_at': ranking.refreshed_at.isoformat() if ranking.refreshed_at else None,
         'topic_count': len(ranking.topics),
         'topics': [{'id': topic.id, 'name': topic.name, 'created_at': topic.created_at} for topic in ranking.topics]
     } for ranking in rankings])
@@ -137,7 +140,7 @@ def get_topic_diversity(topic_id):
 # Function to generate key phrases of text
 @app.route('/keyphrases/<text>')
 def generate_key_phrases(text):
-    nlp_text = nlp(text)
+    nlp_text = get_spacy_nlp()(text)
     key_phrases = [chunk.text for chunk in nlp_text.noun_chunks]
     return key_phrases[:10]
     #return jsonify([{'type': insight.insight_type, 'content': insight.content} for insight in insights])
@@ -1,17 +1,147 @@
-from common import app, db, logger, Article, Topic, init_database, db_path
-from datetime import datetime, timezone
-import os, feedparser, requests
+from common import app, db, logger, Article, Topic, TopicCentroid, SocialMediaPost, Insight, FeedValidator, init_database, migrate_database, db_path
+from datetime import datetime, timezone, timedelta
+import os, feedparser
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sentence_transformers import SentenceTransformer
-import chromadb
-import newspaper
+from sqlalchemy import create_engine, text, select, insert, update, bindparam, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import numpy as np
-from sklearn.cluster import HDBSCAN
-from scipy.spatial.distance import pdist
 from abc import ABC, abstractmethod
 from typing import List
+import queue, threading, random, time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from message_bus import send_message
+from fetch_pool import FetchPool
+from article_extraction import extract_in_pool
+from embeddings import encode_cached
+from model_registry import get_chroma_client, get_vector_store
+from near_duplicates import MinHashIndex, minhash, to_bytes, from_bytes
+
+NEAR_DUPLICATE_WINDOW_DAYS = 7  # How far back stored articles are matched against for near-duplicates
+NEAR_DUPLICATE_EXPIRE_INTERVAL = 3600  # Seconds between sweeps that drop articles older than the window from the index
+CLUSTER_WINDOW_HOURS = 48  # Only articles published this recently are clustered; None clusters the full history
+NEAREST_TOPIC_MAX_DISTANCE = 0.5  # Max euclidean distance from a topic centroid for an article to join that topic
+TOPIC_MERGE_MAX_DISTANCE = 0.3  # Max euclidean distance between two topic centroids for the topics to be merged
+TOPIC_MERGE_CANDIDATES = 3  # Nearest centroids checked per topic in the merge pass, the topic itself included
+DIAMETER_CHUNK_ELEMENTS = 1 << 21  # Max pairwise distances held at once by the exact diameter check (16 MB)
+SQL_IN_CHUNK_SIZE = 500  # Keeps IN (...) lists below SQLite's bound-parameter limit
+INGEST_BATCH_SIZE = 25  # Articles persisted per micro-batch while a source is still streaming
+STREAM_QUEUE_SIZE = 100  # Max parsed articles buffered between the sources and the writer
+
+# Query parameters that only track the referrer and never change the article served
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', '_ga', 'ocid', 'cmpid', 'CMP', 'smid', 'ito'}
+TRACKING_PARAM_PREFIXES = ('utm_',)
+
+def canonicalize_url(url):
+    """
+    Normalize an article URL so syndicated and tracked variants of the same page compare equal:
+    drops tracking parameters and fragments, lowercases the host, and folds AMP variants
+    (amp. hosts, /amp paths, amp=1 / outputType=amp parameters) onto the regular page.
+    """
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if netloc.startswith('amp.'):
+        netloc = netloc[len('amp.'):]
+
+    path = parts.path
+    for suffix in ('/amp/', '/amp', '.amp'):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)] or '/'
+            break
+
+    query = []
+    for key, value in parse_qsl(parts.query, keep_blank_values=True):
+        if key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES):
+            continue
+        if key == 'amp' or (key == 'outputType' and value == 'amp'):
+            continue
+        query.append((key, value))
+
+    return urlunsplit((parts.scheme.lower(), netloc, path, urlencode(sorted(query)), ''))
+
+# In-memory set of canonical URLs already stored, used to skip downloads before they happen
+class KnownURLIndex:
+    def __init__(self):
+        self._urls = set()
+        self._seeded = False
+        self._lock = threading.Lock()
+
+    def _seed(self):
+        with app.app_context():
+            rows = db.session.execute(select(Article.url, Article.canonical_url)).fetchall()
+        # Articles stored before canonical URLs were kept are canonicalized here
+        self._urls.update(row.canonical_url or canonicalize_url(row.url) for row in rows if row.url)
+        self._seeded = True
+        logger.info(f"Known URL index seeded with {len(self._urls)} URLs")
+
+    def __contains__(self, url):
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+            return url in self._urls
+
+    def add_all(self, urls):
+        with self._lock:
+            self._urls.update(urls)
+
+known_urls = KnownURLIndex()
+
+# Near-duplicate detector over article content, seeded from recently stored articles
+class NearDuplicateDetector:
+    def __init__(self, window_days=NEAR_DUPLICATE_WINDOW_DAYS):
+        self.window_days = window_days
+        self._index = None
+        self._expired_at = None  # time.monotonic() of the last sweep of out-of-window articles
+        self._lock = threading.Lock()
+
+    def _seed(self, exclude_ids, cutoff):
+        # The batch being marked is already flushed, so it is excluded to keep articles from matching themselves
+        index = MinHashIndex()
+        rows = db.session.execute(
+            select(Article.id, Article.minhash, Article.published_at)
+            .where(Article.minhash.isnot(None), Article.duplicate_of.is_(None), Article.published_at >= cutoff,
+                   Article.id.notin_(exclude_ids))
+        ).fetchall()
+        for row in rows:
+            index.add(row.id, from_bytes(row.minhash), row.published_at)
+        logger.info(f"Near-duplicate index seeded with {len(rows)} articles")
+        return index
+
+    def fingerprint(self, articles):
+        # Computed before the flush so the fingerprint is part of the INSERT
+        for article in articles:
+            signature = minhash(article.content)
+            article.minhash = to_bytes(signature) if signature is not None else None
+
+    def mark(self, articles):
+        """Point each near-duplicate at the article it copies; must run after IDs are assigned"""
+        duplicates = 0
+        cutoff = datetime.utcnow() - timedelta(days=self.window_days)
+        with self._lock:
+            if self._index is None:
+                self._index = self._seed([article.id for article in articles], cutoff)
+                self._expired_at = time.monotonic()
+            elif time.monotonic() - self._expired_at >= NEAR_DUPLICATE_EXPIRE_INTERVAL:
+                # A long-running ingestor would otherwise keep every article it has ever indexed
+                expired = self._index.expire(cutoff)
+                self._expired_at = time.monotonic()
+                logger.info(f"Expired {expired} articles older than {self.window_days} days from the near-duplicate index")
+            for article in articles:
+                if article.minhash is None:
+                    continue
+                signature = from_bytes(article.minhash)
+                original_id = self._index.find(signature, not_before=cutoff)
+                if original_id is not None:
+                    article.duplicate_of = original_id
+                    duplicates += 1
+                else:
+                    # Undated articles expire a window after they were indexed; times are kept as naive UTC like the DB
+                    published_at = article.published_at or datetime.utcnow()
+                    if published_at.tzinfo is not None:
+                        published_at = published_at.astimezone(timezone.utc).replace(tzinfo=None)
+                    self._index.add(article.id, signature, published_at)
+        return duplicates
+
+near_duplicates = NearDuplicateDetector()
 
 # Abstracting class defining the ingestion strategy
 class IngestionStrategy(ABC):
@@ -19,84 +149,196 @@ class IngestionStrategy(ABC):
     @abstractmethod
     def ingest(self):
         pass
+
+    # Streaming variant of ingest, yielding articles as they are parsed
+    def ingest_stream(self):
+        yield from self.ingest()
+
+    # Called once every article of the last stream has been written; succeeded is False if any batch failed
+    def ingestion_finished(self, succeeded):
+        pass
+
 # RSS feed ingestion strategy
 class RSSFeedIngestionStrategy(IngestionStrategy):
 
-    def __init__(self):
+    def __init__(self, fetch_pool: FetchPool = None):
         self.RSS_FEEDS = [
             'https://moxie.foxnews.com/google-publisher/latest.xml',
             'https://feeds.feedburner.com/ndtvnews-world-news',
             'https://www.theguardian.com/world/rss'
         ]
+        self.fetch_pool = fetch_pool or FetchPool()
+        self.validators = {}
+        # Validators of the last pass, saved only once its articles are stored
+        self.pending_validators = {}
+        # Running totals of feeds answered with 304 versus downloaded in full
+        self.feeds_fetched = 0
+        self.feeds_skipped = 0
+
+    def _load_validators(self):
+        with app.app_context():
+            rows = FeedValidator.query.filter(FeedValidator.feed_url.in_(self.RSS_FEEDS)).all()
+            return {row.feed_url: (row.etag, row.last_modified) for row in rows}
+
+    def _save_validators(self, validators):
+        with app.app_context():
+            rows = FeedValidator.query.filter(FeedValidator.feed_url.in_(list(validators))).all()
+            existing = {row.feed_url: row for row in rows}
+            for feed_url, (etag, last_modified) in validators.items():
+                row = existing.get(feed_url) or FeedValidator(feed_url=feed_url)
+                row.etag = etag
+                row.last_modified = last_modified
+                row.fetched_at = datetime.utcnow()
+                db.session.add(row)
+            db.session.commit()
+
+    def _fetch_feed(self, feed_url):
+        # Conditional GET: the server answers 304 when the feed has not changed since the last fetch
+        etag, last_modified = self.validators.get(feed_url, (None, None))
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        response = self.fetch_pool.get(feed_url, headers=headers)
+        if response.status_code == 304:
+            return None, None
+        response.raise_for_status()
+        validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return feedparser.parse(response.content), validators
+
+    def _entry_to_article(self, entry):
+        published_at = datetime.now(timezone.utc)
+        if hasattr(entry, 'published_parsed'):
+            published_at = datetime(*entry.published_parsed[:6])
+        content = ''
+        if hasattr(entry, 'content'):
+            content = entry.content[0].value
+        elif hasattr(entry, 'summary'):
+            content = entry.summary
+        elif hasattr(entry, 'description'):
+            content = entry.description
+        return Article(
+            title=entry.title,
+            url=entry.link,
+            canonical_url=canonicalize_url(entry.link),
+            published_at=published_at,
+            content=content,
+            processed=False
+        )
     
     def ingest(self):
-        articles = []
-        for feed_url in self.RSS_FEEDS:
-            feed = feedparser.parse(feed_url)
+        return list(self.ingest_stream())
+
+    def ingest_stream(self):
+        self.validators = self._load_validators()
+        updated_validators = {}
+        fetched, skipped, failed = 0, 0, 0
+        # Feeds are fetched concurrently; entries are parsed as each feed arrives
+        for feed_url, result, error in self.fetch_pool.map_unordered(self._fetch_feed, self.RSS_FEEDS):
+            if error:
+                failed += 1
+                logger.warning(f"Failed to fetch RSS feed {feed_url}: {error}")
+                continue
+            feed, validators = result
+            if feed is None:
+                skipped += 1
+                continue
+            fetched += 1
+            if any(validators):
+                updated_validators[feed_url] = validators
             for entry in feed.entries:
-                published_at = datetime.now(timezone.utc)
-                if hasattr(entry, 'published_parsed'):
-                    published_at = datetime(*entry.published_parsed[:6])
-                content = ''
-                if hasattr(entry, 'content'):
-                    content = entry.content[0].value
-                elif hasattr(entry, 'summary'):
-                    content = entry.summary
-                elif hasattr(entry, 'description'):
-                    content = entry.description
-                article = Article(
-                    title=entry.title,
-                    url=entry.link,
-                    published_at=published_at,
-                    content=content,
-                    processed=False
-                )
-                articles.append(article)
-        return articles
+                if canonicalize_url(entry.link) in known_urls:
+                    continue
+                yield self._entry_to_article(entry)
+
+        self.pending_validators = updated_validators
+        self.feeds_fetched += fetched
+        self.feeds_skipped += skipped
+        logger.info(f"RSS feeds fetched: {fetched}, skipped as unchanged: {skipped} (totals: {self.feeds_fetched} fetched, {self.feeds_skipped} skipped)")
+        # A pass in which no feed answered counts as a failure, so the scheduler backs off
+        if failed and not fetched and not skipped:
+            raise RuntimeError(f"All {failed} RSS feeds failed")
+
+    def ingestion_finished(self, succeeded):
+        # Saving a validator before its feed's entries are committed would turn the next poll into a 304
+        # and lose those entries until the feed changes, so a failed pass keeps the old validators
+        pending, self.pending_validators = self.pending_validators, {}
+        if not pending:
+            return
+        if succeeded:
+            self._save_validators(pending)
+        else:
+            logger.warning(f"Not saving validators for {len(pending)} RSS feeds, they will be fetched in full next pass")
+
+# Start of the clustering window as naive UTC, or None when the full history is clustered
+def cluster_window_start():
+    if not CLUSTER_WINDOW_HOURS:
+        return None
+    return datetime.utcnow() - timedelta(hours=CLUSTER_WINDOW_HOURS)
 
 # News API ingestion strategy
 class NewsAPIIngestionStrategy(IngestionStrategy):
-    def __init__(self, api_key):
+    def __init__(self, api_key, fetch_pool: FetchPool = None):
         self.api_key = api_key
-        
+        self.fetch_pool = fetch_pool or FetchPool()
+
+    def _fetch_article(self, article):
+        # Download on the I/O thread pool, then parse the HTML on the extraction process pool
+        response = self.fetch_pool.get(article['url'])
+        response.raise_for_status()
+        extracted = extract_in_pool(article['url'], response.text)
+        if len(extracted['text']) <= 100:
+            return None
+
+        return Article(
+            title = article['title'],
+            url = article['url'],
+            canonical_url = canonicalize_url(article['url']),
+            content = extracted['text'],
+            published_at = datetime.strptime(article['publishedAt'], "%Y-%m-%dT%H:%M:%SZ"),
+            processed = False,
+            multimedia  = article['urlToImage']
+        )
 
     def ingest(self):
-        articles = []
+        return list(self.ingest_stream())
+
+    def ingest_stream(self):
         sources = ['al-jazeera-english', 'associated-press', 'bbc-news', 'cnn']
         num_articles = 100
         url = (f'https://newsapi.org/v2/everything?apiKey={self.api_key}&sortBy=popularity&pageSize={num_articles}&sources={",".join(sources)}')
-        response = requests.get(url).json()
+        # Articles older than the clustering window would never be clustered, so they are not requested or downloaded
+        window_start = cluster_window_start()
+        if window_start:
+            url += f'&from={window_start.strftime("%Y-%m-%dT%H:%M:%S")}'
+        response = self.fetch_pool.get(url).json()
 
         if response['status'] != 'ok':
             raise RuntimeError("News API call failed")
-        
-        for art_num, article in enumerate(response['articles']):
-            #print(article)
-            print(f"Processing news api article {art_num+1} out of {num_articles}")
+
+        results = []
+        skipped_known = 0
+        skipped_old = 0
+        for article in response['articles']:
             if article['content'] is None: # logic should probably be moved to pre-processing phase
                 print("Found empty article, skipping...")
                 continue
+            if window_start and datetime.strptime(article['publishedAt'], "%Y-%m-%dT%H:%M:%SZ") < window_start:
+                skipped_old += 1
+                continue
+            # Articles we already store are never downloaded again
+            if canonicalize_url(article['url']) in known_urls:
+                skipped_known += 1
+                continue
+            results.append(article)
+        logger.info(f"Skipping {skipped_known} already stored and {skipped_old} out-of-window News API articles, downloading {len(results)}")
 
-            try:
-                art = newspaper.article(article['url'])
-                art.download()
-                art.parse()
-                print("Article downloaded")
-            except:
+        for art_num, (article, ingested_article, error) in enumerate(self.fetch_pool.map_unordered(self._fetch_article, results)):
+            print(f"Processed news api article {art_num+1} out of {len(results)}")
+            if error or ingested_article is None:
                 continue
-            
-            if len(art.text) <= 100: continue
-
-            ingested_article = Article(
-                title = article['title'],
-                url = article['url'],
-                content = art.text,
-                published_at = datetime.strptime(article['publishedAt'], "%Y-%m-%dT%H:%M:%SZ"),
-                processed = False,
-                multimedia  = article['urlToImage']
-            )
-            articles.append(ingested_article)
-        return articles
+            yield ingested_article
 
 # Combines multiple ingestion strategie
 class MultipleIngestionStrategy(IngestionStrategy):
@@ -105,10 +347,37 @@ class MultipleIngestionStrategy(IngestionStrategy):
         self.strategies = strategies
     
     def ingest(self):
-        articles = []
+        return list(self.ingest_stream())
+
+    def ingest_stream(self):
+        # Child strategies run in parallel and feed one bounded queue, so a pass takes as long
+        # as the slowest source while memory stays flat however many sources are configured
+        stream_queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        done = object()
+
+        def drain(strategy):
+            try:
+                for article in strategy.ingest_stream():
+                    stream_queue.put(article)
+            except Exception as e:
+                logger.error(f"Ingestion strategy {type(strategy).__name__} failed: {e}")
+            finally:
+                stream_queue.put(done)
+
+        for strategy in self.strategies:
+            threading.Thread(target=drain, args=(strategy,), daemon=True).start()
+
+        remaining = len(self.strategies)
+        while remaining:
+            item = stream_queue.get()
+            if item is done:
+                remaining -= 1
+                continue
+            yield item
+
+    def ingestion_finished(self, succeeded):
         for strategy in self.strategies:
-            articles.extend(strategy.ingest())
-        return articles
+            strategy.ingestion_finished(succeeded)
     
 # Abstracting class for news ingestion
 class Ingestor(ABC):
@@ -124,34 +393,108 @@ class Ingestor(ABC):
 class NewsIngestor(Ingestor):
     def __init__(self, ingestionStrategy: IngestionStrategy):
         self.ingestionStrategy = ingestionStrategy
-    
-    def run_ingestion(self):
-        new_articles = self.ingestionStrategy.ingest()
 
-        with app.app_context():
-            for article in new_articles:
-                if Article.query.filter_by(url=article.url).first():
-                    continue
+    def _existing_urls(self, canonical_urls):
+        # One IN query per chunk instead of one SELECT per article. Older rows have no canonical_url
+        # but may hold a canonical URL in url, so both columns are matched.
+        existing = set()
+        for i in range(0, len(canonical_urls), SQL_IN_CHUNK_SIZE):
+            chunk = canonical_urls[i:i + SQL_IN_CHUNK_SIZE]
+            rows = db.session.execute(
+                select(Article.url, Article.canonical_url)
+                .where(or_(Article.canonical_url.in_(chunk), Article.url.in_(chunk)))
+            ).fetchall()
+            existing.update(row.canonical_url for row in rows if row.canonical_url)
+            existing.update(row.url for row in rows)
+        return existing
+
+    def _persist_batch(self, articles):
+        """Insert all articles not already stored in a single transaction and return the new IDs, or None on failure"""
+        # Collapse duplicate URLs inside the batch before checking the database
+        candidates = {}
+        for article in articles:
+            candidates.setdefault(article.canonical_url, article)
+        if not candidates:
+            return []
 
-                db.session.add(article)
-                db.session.commit()
-                logger.info(f"Article ingested: {article.title}")
-                send_message('articles_ingested', str(article.id))
+        # Skips fingerprinting stored articles and matches rows without a canonical_url; the unique index decides
+        existing = self._existing_urls(list(candidates))
+        new_articles = [article for url, article in candidates.items() if url not in existing]
+        if not new_articles:
+            return []
+
+        articles_table = Article.__table__
+        try:
+            near_duplicates.fingerprint(new_articles)
+            rows = [{column.key: getattr(article, column.key) for column in articles_table.columns if column.key != 'id'}
+                    for article in new_articles]
+            # Articles another ingestor stored since the check above hit the url or canonical_url unique index
+            # and are skipped, instead of failing the whole batch
+            inserted = dict(db.session.execute(
+                sqlite_insert(articles_table).values(rows).on_conflict_do_nothing()
+                .returning(articles_table.c.canonical_url, articles_table.c.id)
+            ).fetchall())
+            new_articles = [article for article in new_articles if article.canonical_url in inserted]
+            for article in new_articles:
+                article.id = inserted[article.canonical_url]
+            duplicates = near_duplicates.mark(new_articles)
+            marked = [{'article_id': article.id, 'original_id': article.duplicate_of}
+                      for article in new_articles if article.duplicate_of is not None]
+            if marked:
+                db.session.execute(
+                    update(articles_table).where(articles_table.c.id == bindparam('article_id'))
+                    .values(duplicate_of=bindparam('original_id')),
+                    marked
+                )
+            ingested = [(article.id, article.title, article.canonical_url) for article in new_articles]
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error ingesting article batch: {e}")
+            db.session.rollback()
+            return None
 
-# Runs the news ingestion process
-def ingest_news():
-    strategies = []
+        if len(ingested) < len(rows):
+            logger.info(f"Skipped {len(rows) - len(ingested)} articles stored concurrently by another ingestor")
+        known_urls.add_all(url for _, _, url in ingested)
+        if duplicates:
+            logger.info(f"Marked {duplicates} of {len(ingested)} new articles as near-duplicates")
+        for _, title, _ in ingested:
+            logger.info(f"Article ingested: {title}")
+        return [article_id for article_id, _, _ in ingested]
+    
+    def _flush(self, batch):
+        with app.app_context():
+            new_ids = self._persist_batch(batch)
+        if new_ids:
+            send_message('articles_ingested', str(new_ids))
+        return new_ids
+    
+    def run_ingestion(self):
+        # Articles are written in micro-batches as the strategy streams them in
+        batch = []
+        fetched, ingested, failed = 0, [], False
+        for article in self.ingestionStrategy.ingest_stream():
+            batch.append(article)
+            fetched += 1
+            if len(batch) >= INGEST_BATCH_SIZE:
+                new_ids = self._flush(batch)
+                failed |= new_ids is None
+                ingested.extend(new_ids or [])
+                batch = []
+        if batch:
+            new_ids = self._flush(batch)
+            failed |= new_ids is None
+            ingested.extend(new_ids or [])
+        self.ingestionStrategy.ingestion_finished(not failed)
+        logger.info(f"Ingested {len(ingested)} new articles out of {fetched} fetched")
+        return ingested
 
+def _news_api_key():
     load_dotenv()
     news_api_key = os.getenv("NEWS_API_KEY")
     if not news_api_key:
         raise ValueError("NEWS_API_KEY not found in environment variables.")
-    strategies.append(NewsAPIIngestionStrategy(news_api_key))
-    strategies.append(RSSFeedIngestionStrategy())
-    news_ingestion_strategy = MultipleIngestionStrategy(strategies)
-
-    newsIngestor = NewsIngestor(news_ingestion_strategy)
-    newsIngestor.run_ingestion()
+    return news_api_key
 
 # Absracting the class for clustering strategy
 class ClusteringStrategy(ABC):
@@ -168,65 +511,386 @@ class ClusteringStrategy(ABC):
     def cluster(self):
         pass
 
+def _max_pairwise_exceeds(points, threshold):
+    """Exact check whether any two points are further apart than threshold, in bounded-size chunks"""
+    squared_norms = np.einsum('ij,ij->i', points, points)
+    rows_per_chunk = max(1, DIAMETER_CHUNK_ELEMENTS // len(points))
+    for start in range(0, len(points), rows_per_chunk):
+        block = points[start:start + rows_per_chunk]
+        # Only pairs (i, j) with j >= i are needed, so compare the block against the remaining points
+        rest = points[start:]
+        # Squared distances built in place so only one chunk-sized array is alive at a time
+        squared = block @ rest.T
+        squared *= -2
+        squared += squared_norms[start:start + rows_per_chunk, None]
+        squared += squared_norms[None, start:]
+        if squared.max() > threshold ** 2:
+            return True
+    return False
+
+def clusters_exceeding_diameter(embeddings, labels, threshold):
+    """
+    Return the labels of clusters whose largest pairwise distance exceeds threshold.
+
+    Centroid radii are computed for all clusters at once. The radius r bounds the
+    diameter d by r <= d <= 2r, which settles most clusters without any pairwise
+    work; only clusters with r <= threshold < 2r fall back to the exact chunked check.
+    """
+    mask = labels != -1
+    if not mask.any():
+        return []
+    cluster_ids, inverse = np.unique(labels[mask], return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    # Points grouped by cluster, gathered in a single copy
+    points = np.asarray(embeddings)[np.flatnonzero(mask)[order]]
+    counts = np.bincount(inverse)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    centroids = np.add.reduceat(points, starts, axis=0) / counts[:, None]
+    point_clusters = inverse[order]
+    distances = np.empty(len(points))
+    rows_per_chunk = max(1, DIAMETER_CHUNK_ELEMENTS // points.shape[1])
+    for start in range(0, len(points), rows_per_chunk):
+        end = start + rows_per_chunk
+        distances[start:end] = np.linalg.norm(points[start:end] - centroids[point_clusters[start:end]], axis=1)
+    radii = np.maximum.reduceat(distances, starts)
+
+    exceeding = [cluster_ids[i] for i in np.flatnonzero(radii > threshold)]
+    for i in np.flatnonzero((radii <= threshold) & (2 * radii > threshold)):
+        if _max_pairwise_exceeds(points[starts[i]:starts[i] + counts[i]], threshold):
+            exceeding.append(cluster_ids[i])
+    return exceeding
+
 # HDBSCAN clustering strategy implementation
 class HDBSCANClusteringStrategy(ClusteringStrategy):
 
-    def __init__(self, DBClient, vectorDBClient):
+    def __init__(self, DBClient, vectorDBClient, article_ids=None):
         self.db = DBClient
         self.vectorDBClient = vectorDBClient
+        self.article_ids = article_ids  # restricts the run to these articles, None clusters the whole store
         self.articles = None
 
     def _set_articles_to_cluster(self):
-        collection = self.vectorDBClient.get_collection("news")
-        self.articles = collection.get(include=["embeddings"])
-        print(self.articles)
+        # Without an ID filter the vector store hands back its memory map, so nothing is copied
+        ids, embeddings = self.vectorDBClient.get(self.article_ids)
+        self.articles = {"ids": ids, "embeddings": embeddings}
  
         
     def cluster(self):
+        from sklearn.cluster import HDBSCAN
         self._set_articles_to_cluster()
 
-        embeddings = np.array(self.articles['embeddings'])
-        hdb = HDBSCAN(min_cluster_size=2)
-        hdb.fit(embeddings)
+        # Compact (float16/int8) stores are widened once here; float32 stores stay zero-copy
+        embeddings = np.asarray(self.articles['embeddings'], dtype=np.float32)
+        min_cluster_size = 2
+        if len(embeddings) < min_cluster_size:
+            # HDBSCAN cannot fit fewer samples than min_cluster_size; treat them all as noise
+            cluster_labels = np.full(len(embeddings), -1)
+        else:
+            hdb = HDBSCAN(min_cluster_size=min_cluster_size)
+            hdb.fit(embeddings)
+            cluster_labels = hdb.labels_
 
         # impose max distance limit
         threshold = 1.0
-        for cluster in np.unique(hdb.labels_):
-            if cluster == -1:
-                continue
-            points = embeddings[hdb.labels_ == cluster]
-            max_dist = np.max(pdist(points))
-            if max_dist > threshold:
-                hdb.labels_[hdb.labels_ == cluster] = -1 # mark as noise
+        for cluster in clusters_exceeding_diameter(embeddings, cluster_labels, threshold):
+            cluster_labels[cluster_labels == cluster] = -1 # mark as noise
+
+        article_ids = [int(article_id) for article_id in self.articles["ids"]]
+        return self._persist_labels(article_ids, cluster_labels)
 
-        labels = set()
+    def _persist_labels(self, article_ids, cluster_labels):
+        """Create a topic per cluster label and point its articles at it, in a constant number of statements"""
         topics = {} # map labels to topics
 
         with app.app_context():
-            article_objects = [Article.query.get(article_id) for article_id in self.articles["ids"]]
-
-            for article, label in zip(article_objects, hdb.labels_):
-                if label != -1 and label not in labels:
-                    labels.add(label)
-                    topic = Topic(name=article.title)
-                    self.db.session.add(topic)
-                    self.db.session.commit()
-                    self.db.session.refresh(topic)
-                    topics[label] = topic.id
-                if label != -1:
-                    article.topic_id = topics[label]
-                
-                article.processed = True
-            
-            db.session.commit() # persist article topic_id updates
+            # Titles for every article in one IN query per chunk, instead of one get() per article
+            titles = {}
+            for i in range(0, len(article_ids), SQL_IN_CHUNK_SIZE):
+                chunk = article_ids[i:i + SQL_IN_CHUNK_SIZE]
+                titles.update(self.db.session.execute(select(Article.id, Article.title).where(Article.id.in_(chunk))).fetchall())
+
+            # Each topic is named after the first article of its cluster
+            topic_names = {}
+            for article_id, label in zip(article_ids, cluster_labels):
+                if label != -1 and label not in topic_names:
+                    topic_names[label] = titles.get(article_id)
+
+            if topic_names:
+                # One batched INSERT ... RETURNING for all new topics
+                labels = list(topic_names)
+                rows = self.db.session.execute(
+                    insert(Topic).returning(Topic.id, sort_by_parameter_order=True),
+                    [{'name': topic_names[label]} for label in labels]
+                ).fetchall()
+                topics = {label: row.id for label, row in zip(labels, rows)}
+
+            # executemany UPDATEs by primary key; noise keeps whatever topic it had
+            clustered = [
+                {'id': article_id, 'topic_id': topics[label], 'processed': True}
+                for article_id, label in zip(article_ids, cluster_labels) if label != -1
+            ]
+            noise = [
+                {'id': article_id, 'processed': True}
+                for article_id, label in zip(article_ids, cluster_labels) if label == -1
+            ]
+            if clustered:
+                self.db.session.execute(update(Article), clustered)
+            if noise:
+                self.db.session.execute(update(Article), noise)
+            self.db.session.commit()
         
         topics_list = [v for v in topics.values()]
         return topics_list
         
+# Incremental clustering: new articles join the nearest existing topic and only the rest go through HDBSCAN
 class NearestTopicClusteringStrategy(ClusteringStrategy):
 
+    def __init__(self, DBClient, vectorDBClient, article_ids=None, max_distance=NEAREST_TOPIC_MAX_DISTANCE, window_start=None):
+        self.db = DBClient
+        self.vectorDBClient = vectorDBClient
+        self.article_ids = article_ids
+        self.max_distance = max_distance
+        self.window_start = window_start  # only topics and articles published since then take part, None for no window
+        self.articles = None
+
+    def _set_articles_to_cluster(self):
+        # Without an ID filter the vector store hands back its memory map, so nothing is copied
+        ids, embeddings = self.vectorDBClient.get(self.article_ids)
+        self.articles = {"ids": ids, "embeddings": embeddings}
+
+    def _topic_index(self):
+        # ANN (HNSW) index over one centroid per topic, rebuilt from the database when empty
+        index = get_chroma_client().create_collection("topic_centroids", get_or_create=True)
+        if index.count() == 0:
+            self._rebuild_topic_index(index)
+        elif self.window_start is not None:
+            self._evict_stale_topics(index)
+        return index
+
+    def _evict_stale_topics(self, index):
+        # Topics with no article inside the window no longer attract new articles
+        topic_ids = [int(topic_id) for topic_id in index.get(include=[])["ids"]]
+        with app.app_context():
+            live = {row.topic_id for row in self.db.session.execute(
+                select(Article.topic_id).distinct()
+                .where(Article.topic_id.in_(topic_ids), Article.published_at >= self.window_start)
+            ).fetchall()}
+        stale = [str(topic_id) for topic_id in topic_ids if topic_id not in live]
+        if stale:
+            index.delete(ids=stale)
+            logger.info(f"Evicted {len(stale)} topics outside the clustering window from the centroid index")
+
+    def _rebuild_topic_index(self, index):
+        # Live topics are those not merged away with at least one article, inside the window when there is one
+        query = (select(Article.topic_id).distinct()
+                 .join(Topic, Topic.id == Article.topic_id)
+                 .where(Topic.merged_into.is_(None)))
+        if self.window_start is not None:
+            query = query.where(Article.published_at >= self.window_start)
+        with app.app_context():
+            topic_ids = [row.topic_id for row in self.db.session.execute(query).fetchall()]
+            stored = self._load_centroids(topic_ids)
+        if not topic_ids:
+            return
+        if stored:
+            index.upsert(
+                ids=[str(topic_id) for topic_id in stored],
+                embeddings=[centroid.tolist() for centroid, _ in stored.values()],
+                metadatas=[{"count": count} for _, count in stored.values()]
+            )
+
+        # Topics created before centroids were stored are summarised once from their titles,
+        # which are already in the embedding cache, so this costs no model inference
+        missing = [topic_id for topic_id in topic_ids if topic_id not in stored]
+        if missing:
+            with app.app_context():
+                rows = self.db.session.execute(
+                    select(Article.topic_id, Article.title)
+                    .where(Article.topic_id.in_(missing), Article.duplicate_of.is_(None))
+                ).fetchall()
+            if rows:
+                embeddings = encode_cached([row.title for row in rows])
+                self._update_centroids(index, np.array([row.topic_id for row in rows]), embeddings)
+        logger.info(f"Topic centroid index rebuilt with {index.count()} topics")
+
+    def _load_centroids(self, topic_ids):
+        """Stored {topic_id: (centroid, article_count)} for the given topics; callers hold an app context"""
+        centroids = {}
+        for i in range(0, len(topic_ids), SQL_IN_CHUNK_SIZE):
+            rows = self.db.session.execute(
+                select(TopicCentroid.topic_id, TopicCentroid.centroid, TopicCentroid.article_count)
+                .where(TopicCentroid.topic_id.in_(topic_ids[i:i + SQL_IN_CHUNK_SIZE]))
+            ).fetchall()
+            for row in rows:
+                centroids[row.topic_id] = (np.frombuffer(row.centroid, dtype=np.float32), row.article_count)
+        return centroids
+
+    def _save_centroids(self, index, centroids):
+        """Write {topic_id: (centroid, article_count)} to the centroid table and the ANN index"""
+        rows = [
+            {'topic_id': topic_id, 'centroid': np.asarray(centroid, dtype=np.float32).tobytes(),
+             'article_count': count, 'updated_at': datetime.utcnow()}
+            for topic_id, (centroid, count) in centroids.items()
+        ]
+        statement = sqlite_insert(TopicCentroid)
+        self.db.session.execute(statement.on_conflict_do_update(
+            index_elements=['topic_id'],
+            set_={column: statement.excluded[column] for column in ('centroid', 'article_count', 'updated_at')}
+        ), rows)
+        self.db.session.commit()
+        index.upsert(
+            ids=[str(topic_id) for topic_id in centroids],
+            embeddings=[np.asarray(centroid, dtype=np.float32).tolist() for centroid, _ in centroids.values()],
+            metadatas=[{"count": int(count)} for _, count in centroids.values()]
+        )
+
+    def _update_centroids(self, index, topic_ids, embeddings):
+        """Fold new member embeddings into each topic's running-mean centroid"""
+        unique_topics = [int(topic_id) for topic_id in np.unique(topic_ids)]
+        with app.app_context():
+            previous = self._load_centroids(unique_topics)
+            centroids = {}
+            for topic_id in unique_topics:
+                members = embeddings[topic_ids == topic_id]
+                total, count = members.sum(axis=0), len(members)
+                if topic_id in previous:
+                    centroid, previous_count = previous[topic_id]
+                    total, count = total + centroid * previous_count, count + previous_count
+                centroids[topic_id] = (total / count, int(count))
+            self._save_centroids(index, centroids)
+
+    def _merge_topics(self, index, topic_ids):
+        """
+        Merge each given topic with any topic whose centroid lies within TOPIC_MERGE_MAX_DISTANCE.
+        The oldest topic of each group survives; returns {merged topic: surviving topic}.
+        """
+        if not topic_ids or index.count() < 2:
+            return {}
+        entries = index.get(ids=[str(topic_id) for topic_id in topic_ids], include=["embeddings"])
+        if not entries["ids"]:
+            return {}
+        result = index.query(
+            query_embeddings=np.asarray(entries["embeddings"], dtype=np.float32).tolist(),
+            n_results=min(TOPIC_MERGE_CANDIDATES, index.count()),
+            include=["distances"]
+        )
+
+        # Union-find over close pairs, always pointing at the lower (older) topic ID
+        parent = {}
+        def root(topic_id):
+            while topic_id in parent:
+                topic_id = parent[topic_id]
+            return topic_id
+        for topic_id, neighbours, distances in zip(entries["ids"], result["ids"], result["distances"]):
+            for neighbour, distance in zip(neighbours, distances):
+                # The l2 space reports squared distances
+                if neighbour == topic_id or distance > TOPIC_MERGE_MAX_DISTANCE ** 2:
+                    continue
+                a, b = root(int(topic_id)), root(int(neighbour))
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+        merged = {topic_id: root(topic_id) for topic_id in parent}
+        if not merged:
+            return {}
+
+        with app.app_context():
+            stored = self._load_centroids(list(merged) + list(set(merged.values())))
+            combined = {}
+            for topic_id in set(merged.values()) | set(merged):
+                if topic_id not in stored:
+                    continue
+                centroid, count = stored[topic_id]
+                survivor = merged.get(topic_id, topic_id)
+                total, total_count = combined.get(survivor, (0, 0))
+                combined[survivor] = (total + centroid * count, total_count + count)
+
+            # Everything that referenced a merged topic now references its survivor
+            moves = [{'old_topic': topic_id, 'new_topic': survivor} for topic_id, survivor in merged.items()]
+            for table in (Article.__table__, SocialMediaPost.__table__, Insight.__table__):
+                statement = update(table).where(table.c.topic_id == bindparam('old_topic')).values(topic_id=bindparam('new_topic'))
+                if table is SocialMediaPost.__table__:
+                    # A post the survivor already has would break the unique (topic_id, content_hash) index, so it is skipped
+                    statement = statement.prefix_with('OR IGNORE')
+                self.db.session.execute(statement, moves)
+            # Posts still left on merged topics are copies of posts the survivor already has
+            self.db.session.execute(SocialMediaPost.__table__.delete().where(SocialMediaPost.topic_id.in_(list(merged))))
+            self.db.session.execute(
+                update(Topic.__table__).where(Topic.__table__.c.id == bindparam('old_topic')).values(merged_into=bindparam('new_topic')),
+                moves
+            )
+            self.db.session.execute(TopicCentroid.__table__.delete().where(TopicCentroid.topic_id.in_(list(merged))))
+            self.db.session.commit()
+            index.delete(ids=[str(topic_id) for topic_id in merged])
+            self._save_centroids(index, {
+                survivor: (total / count, int(count)) for survivor, (total, count) in combined.items() if count
+            })
+        logger.info(f"Merged {len(merged)} topics into {len(set(merged.values()))} existing topics")
+        return merged
+
     def cluster(self):
-        pass
+        self._set_articles_to_cluster()
+        ids = list(self.articles["ids"])
+        if not ids:
+            return []
+        embeddings = np.asarray(self.articles["embeddings"], dtype=np.float32)
+
+        index = self._topic_index()
+        assignments = {}
+        if index.count() > 0:
+            result = index.query(query_embeddings=embeddings.tolist(), n_results=1, include=["distances"])
+            for article_id, topic_ids, distances in zip(ids, result["ids"], result["distances"]):
+                # The l2 space reports squared distances
+                if topic_ids and distances[0] <= self.max_distance ** 2:
+                    assignments[article_id] = int(topic_ids[0])
+
+        if assignments:
+            with app.app_context():
+                self.db.session.execute(update(Article), [
+                    {'id': article_id, 'topic_id': topic_id, 'processed': True}
+                    for article_id, topic_id in assignments.items()
+                ])
+                self.db.session.commit()
+            logger.info(f"Assigned {len(assignments)} of {len(ids)} articles to existing topics")
+
+        # Only articles no existing topic claimed are clustered from scratch, together with
+        # earlier noise still inside the window that may now have company
+        leftover = [article_id for article_id in ids if article_id not in assignments]
+        if leftover and self.window_start is not None:
+            leftover += self._window_noise_ids(exclude=set(ids))
+        new_topics = []
+        if leftover:
+            new_topics = HDBSCANClusteringStrategy(self.db, self.vectorDBClient, article_ids=leftover).cluster()
+            if new_topics:
+                with app.app_context():
+                    rows = self.db.session.execute(
+                        select(Article.id, Article.topic_id)
+                        .where(Article.id.in_(leftover), Article.topic_id.in_(new_topics))
+                    ).fetchall()
+                assignments.update({row.id: row.topic_id for row in rows})
+
+        if assignments:
+            member_ids, member_embeddings = self.vectorDBClient.get(list(assignments))
+            self._update_centroids(index, np.array([assignments[i] for i in member_ids]), np.asarray(member_embeddings, dtype=np.float32))
+
+        # Topics created or grown in this run may now sit on top of another topic for the same story
+        merged = self._merge_topics(index, sorted(set(assignments.values())))
+        new_topics = [topic_id for topic_id in new_topics if topic_id not in merged]
+        touched_topics = sorted({merged.get(topic_id, topic_id) for topic_id in assignments.values()} - set(new_topics))
+        # Merged-away topics are reported too, so the ranking drops them
+        return touched_topics + new_topics + sorted(merged)
+
+    def _window_noise_ids(self, exclude):
+        with app.app_context():
+            rows = self.db.session.execute(
+                select(Article.id).where(
+                    Article.processed == True,
+                    Article.topic_id.is_(None),
+                    Article.duplicate_of.is_(None),
+                    Article.published_at >= self.window_start
+                )
+            ).fetchall()
+        return [row.id for row in rows if row.id not in exclude and row.id in self.vectorDBClient]
 
 class TopicGenerator:
     def __init__(self, clustering_strategy: ClusteringStrategy):
@@ -240,28 +904,173 @@ class TopicGenerator:
         else:
             logger.info("No topics generated")
 
+# Cheap check for articles cluster_articles would pick up: unprocessed, not near-duplicates, inside the window
+def has_unclustered_articles():
+    engine = create_engine(f'sqlite:///{db_path}')
+    query = "SELECT EXISTS (SELECT 1 FROM article WHERE processed = False AND duplicate_of IS NULL"
+    params = {}
+    window_start = cluster_window_start()
+    if window_start:
+        query += " AND published_at >= :window_start"
+        params['window_start'] = _sqlite_datetime(window_start)
+    with engine.connect() as conn:
+        return bool(conn.execute(text(query + ")"), params).scalar())
+
 # Runs article clustering process
 def cluster_articles():
 
     engine = create_engine(f'sqlite:///{db_path}')
+    vector_store = get_vector_store()
+    window_start = cluster_window_start()
+    if window_start:
+        _evict_expired(engine, vector_store, window_start)
+
+    # Near-duplicates are not embedded; they inherit their original's topic below
+    query = "SELECT id, title FROM article WHERE processed = False AND duplicate_of IS NULL"
+    params = {}
+    if window_start:
+        query += " AND published_at >= :window_start"
+        params['window_start'] = _sqlite_datetime(window_start)
     with engine.connect() as conn:
-        articles = conn.execute(text("SELECT id, title FROM article WHERE processed = False")).fetchall()
+        articles = conn.execute(text(query), params).fetchall()
 
     if not articles:
         logger.info("No unprocessed articles found.")
+        _assign_duplicates_to_topics(engine)
         return
 
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    embeddings = model.encode([a.title for a in articles])
+    # Only titles missing from the persistent cache go through the model
+    embeddings = encode_cached([a.title for a in articles])
 
-    client = chromadb.Client()
-    collection = client.create_collection("news", get_or_create=True)
-    ids = [str(a.id) for a in articles]
-    collection.add(ids=ids, embeddings=embeddings.tolist())
+    # Embeddings persist on disk next to the database, so restarts keep every clustered vector
+    ids = [a.id for a in articles]
+    vector_store.add(ids, embeddings)
 
-    strategy = HDBSCANClusteringStrategy(db, client)
+    # Only the newly unprocessed articles are clustered, joining existing topics where close enough
+    strategy = NearestTopicClusteringStrategy(db, vector_store, article_ids=ids, window_start=window_start)
     topic_generator = TopicGenerator(strategy)
     topic_generator.run_clustering()
+    _assign_duplicates_to_topics(engine)
+
+# Same text format SQLAlchemy uses for DateTime columns on SQLite, so raw SQL comparisons are lexical
+def _sqlite_datetime(dt):
+    return dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+# Drops vectors of articles published before the window and retires unprocessed articles that are already too old
+def _evict_expired(engine, vector_store, window_start):
+    window_start_param = _sqlite_datetime(window_start)
+    stored_ids = vector_store.ids()
+    live = set()
+    query = text("SELECT id FROM article WHERE id IN :ids AND published_at >= :window_start").bindparams(bindparam('ids', expanding=True))
+    with engine.begin() as conn:
+        for i in range(0, len(stored_ids), SQL_IN_CHUNK_SIZE):
+            rows = conn.execute(query, {'ids': stored_ids[i:i + SQL_IN_CHUNK_SIZE], 'window_start': window_start_param}).fetchall()
+            live.update(row.id for row in rows)
+        retired = conn.execute(text(
+            "UPDATE article SET processed = True WHERE processed = False AND (published_at IS NULL OR published_at < :window_start)"
+        ), {'window_start': window_start_param})
+
+    expired = [vector_id for vector_id in stored_ids if vector_id not in live]
+    if expired:
+        vector_store.delete(expired)
+        logger.info(f"Evicted {len(expired)} vectors published before {window_start}")
+    if retired.rowcount:
+        logger.info(f"Skipped clustering {retired.rowcount} unprocessed articles published before {window_start}")
+
+# Gives unprocessed near-duplicates the topic of the article they copy
+def _assign_duplicates_to_topics(engine):
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "UPDATE article SET processed = True, "
+            "topic_id = (SELECT original.topic_id FROM article AS original WHERE original.id = article.duplicate_of) "
+            "WHERE processed = False AND duplicate_of IS NOT NULL RETURNING topic_id"
+        )).fetchall()
+    if rows:
+        logger.info(f"Assigned {len(rows)} near-duplicate articles to their originals' topics")
+    # Duplicates count towards their topic's score, so the topics they joined are re-ranked
+    topic_ids = sorted({row.topic_id for row in rows if row.topic_id is not None})
+    if topic_ids:
+        send_message('topics_generated', str(topic_ids))
+
+RSS_POLL_INTERVAL = 300  # Seconds between RSS polls
+NEWS_API_POLL_INTERVAL = 1800  # Seconds between NewsAPI polls, slower to respect the API quota
+POLL_JITTER = 0.1  # Fraction of the interval randomly added or removed so sources do not poll in lockstep
+MAX_POLL_BACKOFF = 3600  # Upper bound in seconds on the retry delay of a failing source
+
+# A source polled by the ingestion scheduler on its own interval
+class ScheduledSource:
+    def __init__(self, name, strategy: IngestionStrategy, interval, jitter=POLL_JITTER):
+        self.name = name
+        self.strategy = strategy
+        self.interval = interval
+        self.jitter = jitter
+        self.failures = 0
+        self.running = threading.Lock()
+
+    def next_delay(self):
+        # Exponential backoff after consecutive failures, capped at MAX_POLL_BACKOFF
+        delay = self.interval
+        if self.failures:
+            delay = min(self.interval * 2 ** self.failures, max(self.interval, MAX_POLL_BACKOFF))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+# Polls each source on its own thread and clusters the new articles after every pass
+class IngestionScheduler:
+    def __init__(self, sources: List[ScheduledSource]):
+        self.sources = sources
+        self._clustering_lock = threading.Lock()
+
+    def run_pass(self, source: ScheduledSource):
+        # Never run two passes of the same source at once
+        if not source.running.acquire(blocking=False):
+            logger.warning(f"Previous {source.name} ingestion pass still running, skipping")
+            return
+        try:
+            NewsIngestor(source.strategy).run_ingestion()
+            source.failures = 0
+        except Exception as e:
+            source.failures += 1
+            logger.error(f"{source.name} ingestion pass failed ({source.failures} in a row): {e}")
+        finally:
+            source.running.release()
+
+        # Clustering shares the vector store, so passes from different sources take turns.
+        # It runs whenever articles are waiting, not only after new ones, so articles left by a failed
+        # clustering run or a restart are picked up by the next pass of any source, even a failed one
+        with self._clustering_lock:
+            try:
+                if has_unclustered_articles():
+                    cluster_articles()
+            except Exception as e:
+                # The articles stay unprocessed and are clustered by the next pass
+                logger.error(f"Clustering after {source.name} ingestion pass failed: {e}")
+
+    def _poll(self, source: ScheduledSource):
+        while True:
+            # Nothing a single pass raises may end the source's polling thread
+            try:
+                self.run_pass(source)
+            except Exception as e:
+                logger.error(f"Unexpected error in {source.name} ingestion pass: {e}")
+            delay = source.next_delay()
+            logger.info(f"Next {source.name} ingestion pass in {delay:.0f} seconds")
+            time.sleep(delay)
+
+    def run(self):
+        threads = [threading.Thread(target=self._poll, args=(source,), daemon=True) for source in self.sources]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+# Runs ingestion continuously, polling every source on its own schedule
+def run_ingestion_scheduler():
+    fetch_pool = FetchPool()
+    sources = [
+        ScheduledSource('RSS', RSSFeedIngestionStrategy(fetch_pool), RSS_POLL_INTERVAL),
+        ScheduledSource('NewsAPI', NewsAPIIngestionStrategy(_news_api_key(), fetch_pool), NEWS_API_POLL_INTERVAL),
+    ]
+    IngestionScheduler(sources).run()
 
 
 # def process_articles():
@@ -314,6 +1123,6 @@ if __name__ == '__main__':
         init_database()
     else:
         logger.info("Database file already exists.")
-    # ingest_news()
+        migrate_database()
     # cluster_articles()
     # process_articles()
@@ -4,10 +4,8 @@ import random
 import threading
 from gemini_client import generate_content
 from message_bus import insights_queue
-import spacy
 from service_diversity import calculate_diversity_score, update_ranked_topics_diversity
-
-nlp = spacy.load("en_core_web_sm")
+from model_registry import get_spacy_nlp
 
 # Function to analyze sentiment of social media posts
 def analyze_sentiment_for_topic(topic_id):
@@ -94,6 +92,7 @@ def analyze_sentiment_for_topic(topic_id):
 
 def generate_multimedia(topic_id):
     topic_articles = Article.query.filter(Article.topic_id == topic_id).all()
+    nlp = get_spacy_nlp()
     for article in topic_articles:
         doc = nlp(article.content)
         locations = [ent.text for ent in doc.ents if ent.label_ in ("GPE", "LOC", "FAC")]
@@ -194,7 +193,8 @@ def generate_insights():
                     ranked_items = RankingsTopics.query.filter_by(ranking_id=ranking_id).order_by(RankingsTopics.rank_order).all()
                     for item in ranked_items:
                         topic = Topic.query.get(item.topic_id)
-                        topic_articles = Article.query.filter(Article.topic_id == topic.id).all()
+                        # Near-duplicates would only repeat the same story in the prompt
+                        topic_articles = Article.query.filter(Article.topic_id == topic.id, Article.duplicate_of.is_(None)).all()
 
                         prompt_content = ""
                         for i, article in enumerate(topic_articles):
@@ -1,107 +1,187 @@
-from common import app, db, logger, Topic, Ranking, RankingsTopics, SocialMediaPost, Article, Insight
-import threading, requests
+from common import app, db, logger, Topic, Ranking, RankingsTopics, SocialMediaPost, Article, Insight, social_post_hash
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
 from message_bus import ranking_queue, social_queue, send_message
+import os
 import time
+import hashlib
 import math
+import bisect
+import heapq
+import numpy as np
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from fetch_pool import FetchPool
 
 RANK_INTERVAL = 300  # Run ranking every 5 minutes
+RANK_COALESCE_WINDOW = float(os.getenv("RANK_COALESCE_WINDOW", "30"))  # Seconds topic changes are gathered into one ranking run
 RECENCY_WEIGHT = 0.6  # Weight for time decay
 ARTICLE_COUNT_WEIGHT = 0.4  # Weight for article count
 TIME_DECAY_HOURS = 24  # Time decay factor in hours
+RANKING_HISTORY_FULL_HOURS = 24  # Every ranking is kept this long
+RANKING_HISTORY_MAX_DAYS = 30  # After the full window one ranking per hour is kept up to this age, older ones are deleted
+RANKING_COMPACT_INTERVAL = 3600  # Seconds between ranking history compactions
+SOCIAL_SEARCH_URL = 'https://public.api.bsky.app/xrpc/app.bsky.feed.searchPosts'
+SOCIAL_FETCH_WORKERS = 10  # Concurrent social searches, enough for every topic of a ranking at once
+SOCIAL_FETCH_TIMEOUT = 10  # Seconds allowed per search request
+SOCIAL_FETCH_RETRIES = 3  # Retries on 429 and 5xx responses, with exponential backoff
+SOCIAL_CACHE_TTL = int(os.getenv("SOCIAL_CACHE_TTL", "900"))  # Seconds a search result is reused before the query is searched again
+SOCIAL_CACHE_MAX_ENTRIES = 1000  # Queries (and topic cursors) kept, least recently used evicted first
 
-def ensure_timezone(dt):
-    """Ensure datetime has timezone information"""
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt
+TOP_RANKED_TOPICS = 10  # Topics kept in each ranking
+SQL_IN_CHUNK_SIZE = 500  # Keeps IN (...) lists below SQLite's bound-parameter limit
 
-def calculate_topic_score(topic, current_time):
-    """
-    Calculate topic score based on:
-    1. Recency of articles (with time decay)
-    2. Number of articles
-    3. Source diversity
-    """
-    # current_time = datetime.now(timezone.utc)
-    
-    # Calculate recency score
-    recency_scores = []
-    sources = set()
-    try:
-        topic_articles = Article.query.filter(Article.topic_id == topic.id).all()
-        for article in topic_articles:
-            article_time = ensure_timezone(article.published_at)
-            # Time decay calculation
-            age_hours = (current_time - article_time).total_seconds() / 3600
-            time_factor = math.exp(-age_hours / TIME_DECAY_HOURS)  # Exponential decay
-            recency_scores.append(time_factor)
-            
-            # Track unique sources
-            if hasattr(article, 'source') and article.source:
-                sources.add(article.source)
-        
-        # Average recency score (time decay)
-        avg_recency = sum(recency_scores) / len(recency_scores) if recency_scores else 0
-        
-        # Article count score (normalized by log to prevent domination by count)
-        article_count = math.log(1 + len(topic_articles))
-        
-        # Source diversity bonus (normalized)
-        source_diversity = len(sources) / 3  # Assuming we want at least 3 sources for max diversity
-        
-        # Combine scores with weights
-        final_score = (
-            RECENCY_WEIGHT * avg_recency +
-            ARTICLE_COUNT_WEIGHT * article_count +
-            0.2 * source_diversity  # 20% weight for source diversity
-        )
+# Incremental ranking state. Each topic's score at time now is
+#   RECENCY_WEIGHT * mean_i exp(-(now - t_i) / TIME_DECAY_HOURS) + ARTICLE_COUNT_WEIGHT * log(1 + n)
+# and the mean factors into exp(recency_key - now / TIME_DECAY_HOURS), where recency_key = log mean_i exp(t_i / TIME_DECAY_HOURS)
+# with times in hours since a fixed epoch. Both parts are fixed until the topic gains articles,
+# so aging needs no recomputation and only changed topics are ever re-read from the database.
+class RankingEngine:
+    def __init__(self):
+        self.epoch = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        self._components = {}  # topic_id -> (recency_key, count_term)
+        # Topics ordered by each component, best first, as (-component, topic_id) for the threshold walk
+        self._by_recency = []
+        self._by_count = []
+        self._seeded = False
+        self._lock = threading.Lock()
 
-        logger.info(f"Topic score calculated: {topic}, {final_score}, article count: {article_count}")
-        
-        return final_score
-    except Exception as e:
-        logger.error(f"Error calculating score for topic {topic.id}: {e}")
-        return 0
+    def _hours(self, times):
+        # SQLite hands back naive datetimes, which are UTC
+        epoch = np.datetime64(self.epoch.replace(tzinfo=None), 'us')
+        return (np.array(times, dtype='datetime64[us]') - epoch) / np.timedelta64(1, 'h')
+
+    def _load(self, topic_ids=None):
+        """Score components of the given topics (every live topic when None) from their articles"""
+        query = (select(Article.topic_id, Article.published_at)
+                 .join(Topic, Topic.id == Article.topic_id)
+                 .where(Topic.merged_into.is_(None)))
+        if topic_ids is None:
+            rows = db.session.execute(query).fetchall()
+        else:
+            rows = []
+            for i in range(0, len(topic_ids), SQL_IN_CHUNK_SIZE):
+                rows += db.session.execute(query.where(Article.topic_id.in_(topic_ids[i:i + SQL_IN_CHUNK_SIZE]))).fetchall()
+        if not rows:
+            return {}
+
+        topics, groups = np.unique(np.fromiter((row.topic_id for row in rows), dtype=np.int64, count=len(rows)), return_inverse=True)
+        decay = self._hours([row.published_at for row in rows]) / TIME_DECAY_HOURS
+        undated = np.isnan(decay)
+        decay[undated] = -np.inf
+
+        # Grouped log-sum-exp, shifted by each topic's newest article so nothing overflows
+        newest = np.full(len(topics), -np.inf)
+        np.maximum.at(newest, groups, decay)
+        shift = np.where(np.isfinite(newest), newest, 0.0)
+        counts = np.bincount(groups, minlength=len(topics))
+        sums = np.bincount(groups, weights=np.exp(decay - shift[groups]), minlength=len(topics))
+        with np.errstate(divide='ignore'):
+            recency_keys = shift + np.log(sums / counts)
+        count_terms = ARTICLE_COUNT_WEIGHT * np.log1p(counts)
 
+        # A topic with an undated article has always scored 0
+        has_undated = np.bincount(groups, weights=undated, minlength=len(topics)) > 0
+        recency_keys[has_undated] = -np.inf
+        count_terms[has_undated] = 0.0
+        return {int(t): (float(r), float(c)) for t, r, c in zip(topics, recency_keys, count_terms)}
 
-def create_new_ranking(topics):
-    """Create new ranking with error handling"""
+    def _set(self, topic_id, components):
+        previous = self._components.pop(topic_id, None)
+        if previous is not None:
+            del self._by_recency[bisect.bisect_left(self._by_recency, (-previous[0], topic_id))]
+            del self._by_count[bisect.bisect_left(self._by_count, (-previous[1], topic_id))]
+        if components is not None:
+            self._components[topic_id] = components
+            bisect.insort(self._by_recency, (-components[0], topic_id))
+            bisect.insort(self._by_count, (-components[1], topic_id))
+
+    def _seed(self):
+        for topic_id, components in self._load().items():
+            self._set(topic_id, components)
+        self._seeded = True
+        logger.info(f"Ranking engine seeded with {len(self._components)} topics")
+
+    def refresh(self, topic_ids):
+        """Re-read the given topics; topics left without articles (e.g. merged away) are dropped"""
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+                return
+            topic_ids = sorted({int(topic_id) for topic_id in topic_ids})
+            loaded = self._load(topic_ids)
+            for topic_id in topic_ids:
+                self._set(topic_id, loaded.get(topic_id))
+
+    def _score(self, topic_id, now_hours):
+        recency_key, count_term = self._components[topic_id]
+        return RECENCY_WEIGHT * math.exp(recency_key - now_hours / TIME_DECAY_HOURS) + count_term
+
+    def top_k(self, current_time, k=TOP_RANKED_TOPICS):
+        """
+        Return the k best (topic_id, score) pairs at current_time, ties going to the older topic.
+        Walks both component orders in step and stops once no unseen topic can beat the k-th best seen (threshold algorithm).
+        """
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+            now_hours = (current_time - self.epoch).total_seconds() / 3600
+            heap, seen = [], set()
+            for depth in range(len(self._components)):
+                for _, topic_id in (self._by_recency[depth], self._by_count[depth]):
+                    if topic_id in seen:
+                        continue
+                    seen.add(topic_id)
+                    # Min-heap on (score, -topic_id) evicts the lowest score, and the newest topic among equals
+                    heapq.heappush(heap, (self._score(topic_id, now_hours), -topic_id))
+                    if len(heap) > k:
+                        heapq.heappop(heap)
+                best_unseen = RECENCY_WEIGHT * math.exp(-self._by_recency[depth][0] - now_hours / TIME_DECAY_HOURS) - self._by_count[depth][0]
+                if len(heap) == k and heap[0][0] > best_unseen:
+                    break
+            return [(-negated_id, score) for score, negated_id in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+
+    def __len__(self):
+        return len(self._components)
+
+ranking_engine = RankingEngine()
+
+def ranking_hash(topic_ids):
+    """Content hash of a ranking: the topic IDs in rank order"""
+    return hashlib.sha1(','.join(str(topic_id) for topic_id in topic_ids).encode('utf-8')).hexdigest()
+
+def create_new_ranking(ranked_topics):
+    """
+    Create new ranking from (topic_id, score) pairs, best first, with error handling.
+    When the order matches the latest ranking, only its refreshed_at is updated and None is returned.
+    """
     try:
-        # Calculate scores and sort topics
-        topic_scores = []
-        current_time = datetime.now(timezone.utc)
-        
-        # Filter topics to only include those with articles
-        topics_with_articles = []
-        for topic in topics:
-            article_count = db.session.query(Article.id).filter_by(topic_id=topic.id).count()
-            if article_count > 0:
-                topics_with_articles.append(topic)
-        
-        if not topics_with_articles:
-            logger.warning("No topics with articles found for ranking")
-            # Fall back to all topics if none have articles
-            topics_with_articles = topics
-        
-        logger.info(f"Ranking {len(topics_with_articles)} topics with articles out of {len(topics)} total topics")
-        
-        for topic in topics_with_articles:
-            score = calculate_topic_score(topic, current_time)
-            topic_scores.append((topic, score))
-        
-        ranked_topics = sorted(topic_scores, key=lambda x: x[1], reverse=True)[:10]
-        
+        content_hash = ranking_hash(topic_id for topic_id, _ in ranked_topics)
+        latest = Ranking.query.order_by(Ranking.id.desc()).first()
+        if latest is not None:
+            latest_hash = latest.content_hash
+            if latest_hash is None:
+                # Rankings written before hashing was added are hashed from their rows
+                rows = RankingsTopics.query.filter_by(ranking_id=latest.id).order_by(RankingsTopics.rank_order).all()
+                latest_hash = ranking_hash(row.topic_id for row in rows)
+            if latest_hash == content_hash:
+                latest.content_hash = content_hash
+                latest.refreshed_at = datetime.utcnow()
+                db.session.commit()
+                logger.info(f"Ranking unchanged since ranking {latest.id}, refreshed its timestamp")
+                return None
+
         # Create new ranking
-        new_ranking = Ranking()
+        new_ranking = Ranking(content_hash=content_hash)
         db.session.add(new_ranking)
         db.session.commit()
         
         # Add ranked topics
-        for idx, (topic, _) in enumerate(ranked_topics):
+        for idx, (topic_id, _) in enumerate(ranked_topics):
             rt = RankingsTopics(
                 ranking_id=new_ranking.id,
-                topic_id=topic.id,
+                topic_id=topic_id,
                 rank_order=idx+1
             )
             db.session.add(rt)
@@ -116,43 +196,147 @@ def create_new_ranking(topics):
         db.session.rollback()
         return None
 
-def periodic_ranking():
-    """Periodic ranking with improved error handling"""
-    logger.info("Starting periodic ranking service")
-    while True:
+def compact_ranking_history(current_time=None):
+    """
+    Downsample ranking history: every ranking is kept for RANKING_HISTORY_FULL_HOURS, then the last one
+    of each hour until RANKING_HISTORY_MAX_DAYS, and none after that. The latest ranking is always kept.
+    Callers hold an app context.
+    """
+    current_time = current_time or datetime.utcnow()
+    full_cutoff = current_time - timedelta(hours=RANKING_HISTORY_FULL_HOURS)
+    max_cutoff = current_time - timedelta(days=RANKING_HISTORY_MAX_DAYS)
+    latest_id = db.session.execute(select(func.max(Ranking.id))).scalar()
+    rows = db.session.execute(
+        select(Ranking.id, Ranking.created_at).where(Ranking.created_at < full_cutoff, Ranking.id != latest_id)
+    ).fetchall()
+
+    doomed, hourly = [], {}
+    for row in rows:
+        if row.created_at < max_cutoff:
+            doomed.append(row.id)
+            continue
+        hour = row.created_at.replace(minute=0, second=0, microsecond=0)
+        kept = hourly.get(hour)
+        if kept is None:
+            hourly[hour] = row.id
+        else:
+            hourly[hour] = max(kept, row.id)
+            doomed.append(min(kept, row.id))
+
+    try:
+        for i in range(0, len(doomed), SQL_IN_CHUNK_SIZE):
+            chunk = doomed[i:i + SQL_IN_CHUNK_SIZE]
+            db.session.execute(delete(RankingsTopics).where(RankingsTopics.ranking_id.in_(chunk)))
+            db.session.execute(delete(Ranking).where(Ranking.id.in_(chunk)))
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error compacting ranking history: {e}")
+        db.session.rollback()
+        return 0
+    if doomed:
+        logger.info(f"Compacted ranking history, removed {len(doomed)} rankings")
+    return len(doomed)
+
+def rank_from_engine():
+    """Rank the current top topics; callers hold an app context"""
+    ranked_topics = ranking_engine.top_k(datetime.now(timezone.utc))
+    if not ranked_topics:
+        logger.info("No topics with articles found for ranking")
+        return None
+    logger.info(f"Ranking top {len(ranked_topics)} of {len(ranking_engine)} topics with articles")
+    return create_new_ranking(ranked_topics)
+
+# Single writer for all rankings: event triggers arriving within RANK_COALESCE_WINDOW of the first one
+# are merged into one run, and the periodic ranking only fires after RANK_INTERVAL without any run
+class RankingCoordinator:
+    def __init__(self, window=RANK_COALESCE_WINDOW, interval=RANK_INTERVAL):
+        self.window = window
+        self.interval = interval
+        self._pending = set()
+        self._first_trigger = None
+        # Backdated so the first periodic ranking runs at startup
+        self._last_run = time.monotonic() - interval
+        self._last_compaction = time.monotonic() - RANKING_COMPACT_INTERVAL
+        self._condition = threading.Condition()
+
+    def trigger(self, topic_ids):
+        """Queue changed topics for the next ranking run"""
+        with self._condition:
+            self._pending.update(int(topic_id) for topic_id in topic_ids)
+            if self._first_trigger is None:
+                self._first_trigger = time.monotonic()
+            self._condition.notify()
+
+    def _next_run(self):
+        # Waits until the coalescing window closes or the periodic timer expires, then takes the pending topics
+        with self._condition:
+            while True:
+                if self._first_trigger is not None:
+                    deadline = self._first_trigger + self.window
+                else:
+                    deadline = self._last_run + self.interval
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            topic_ids, self._pending, self._first_trigger = self._pending, set(), None
+            return topic_ids
+
+    def run(self):
+        logger.info(f"Ranking coordinator started (coalescing window {self.window}s, periodic interval {self.interval}s)")
+        while True:
+            topic_ids = self._next_run()
+            try:
+                with app.app_context():
+                    if topic_ids:
+                        # Only the topics that changed are re-read
+                        ranking_engine.refresh(topic_ids)
+                    # Scores age in closed form, so a periodic ranking reads nothing from the database
+                    ranking_id = rank_from_engine()
+                    if ranking_id:
+                        reason = f"{len(topic_ids)} changed topics" if topic_ids else "periodic"
+                        logger.info(f"Ranking {ranking_id} created ({reason})")
+            except Exception as e:
+                logger.error(f"Error in ranking coordinator: {e}")
+            finally:
+                # Any run, event-driven or periodic, restarts the periodic timer
+                self._last_run = time.monotonic()
+            self._compact_if_due()
+
+    def _compact_if_due(self):
+        # History is compacted on the writer thread so it never races a ranking insert
+        if time.monotonic() - self._last_compaction < RANKING_COMPACT_INTERVAL:
+            return
+        self._last_compaction = time.monotonic()
         try:
             with app.app_context():
-                topics = Topic.query.all()
-                if topics:
-                    ranking_id = create_new_ranking(topics)
-                    if ranking_id:
-                        logger.info(f"Periodic ranking completed, created ranking {ranking_id}")
-                else:
-                    logger.info("No topics found for ranking")
+                compact_ranking_history()
         except Exception as e:
-            logger.error(f"Error in periodic ranking: {e}")
-        
-        time.sleep(RANK_INTERVAL)
+            logger.error(f"Error in ranking history compaction: {e}")
+
+ranking_coordinator = RankingCoordinator()
+
+# Pooled client for social searches: one keep-alive connection per worker, all against the same host
+social_fetch_pool = FetchPool(
+    max_workers=SOCIAL_FETCH_WORKERS, per_host_limit=SOCIAL_FETCH_WORKERS,
+    timeout=SOCIAL_FETCH_TIMEOUT, retries=SOCIAL_FETCH_RETRIES
+)
 
 def handle_new_topics(message):
     """Handle new topics with error handling"""
-    with app.app_context():
-        try:
-            topic_ids = eval(message['body'])
-            topics = Topic.query.filter(Topic.id.in_(topic_ids)).all()
-            if topics:
-                all_topics = Topic.query.all()
-                create_new_ranking(all_topics)
-                logger.info("Ranking updated due to new topics")
-        except Exception as e:
-            logger.error(f"Error processing new topics: {e}")
+    try:
+        topic_ids = eval(message['body'])
+        if topic_ids:
+            ranking_coordinator.trigger(topic_ids)
+    except Exception as e:
+        logger.error(f"Error processing new topics: {e}")
 
 def rank_topics():
     """Main ranking service"""
     logger.info("Rank topics service started")
     
-    # Start periodic ranking
-    threading.Thread(target=periodic_ranking, daemon=True).start()
+    # Every ranking, periodic or event-driven, is written by the coordinator thread
+    threading.Thread(target=ranking_coordinator.run, daemon=True).start()
     
     # Handle event-based ranking
     while True:
@@ -164,6 +348,139 @@ def rank_topics():
         
         ranking_queue.task_done()
         
+# Creation time of a social post, from its record's createdAt; the current time when missing or malformed
+def post_created_at(post):
+    created_at_str = post.get('record', {}).get('createdAt')
+    try:
+        if created_at_str:
+            # Truncate microseconds to 6 digits and ensure proper format
+            if '.' in created_at_str:
+                base, ms = created_at_str.split('.')
+                ms = ms.replace('Z', '')[:6]  # Remove Z and truncate to 6 digits
+                created_at_str = f"{base}.{ms}Z"
+            created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
+            # Offset-less timestamps are UTC
+            return created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+    except ValueError as e:
+        logger.warning(f"Invalid datetime format: {created_at_str}, using current time")
+    return datetime.now(timezone.utc)
+
+# Social search results by query with TTL and LRU eviction, plus a per-topic cursor of the last search stored for it.
+# Topics stay ranked across many consecutive rankings, so a fresh result is never searched again, and each topic
+# only receives the posts of a result created since its cursor.
+class SocialSearchCache:
+    def __init__(self, ttl=SOCIAL_CACHE_TTL, max_entries=SOCIAL_CACHE_MAX_ENTRIES):
+        self.ttl = timedelta(seconds=ttl)
+        self.max_entries = max_entries
+        self._results = OrderedDict()  # query -> (fetched_at, posts)
+        self._cursors = OrderedDict()  # topic_id -> fetched_at of the last result stored for the topic
+        self._query_locks = {}  # query -> lock, so topics sharing a query in one ranking search it once
+        self._lock = threading.Lock()
+
+    def _remember(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            evicted, _ = entries.popitem(last=False)
+            if entries is self._results:
+                self._query_locks.pop(evicted, None)
+
+    def search(self, topic_id, search_query, not_before):
+        """
+        Return (status_code, posts, fetched_at) for a topic's query, only calling the API when the query has no
+        fresh result. Posts are limited to those created since the topic's cursor, so a fresh result the topic
+        has already stored comes back empty. Call mark_stored once the posts are committed.
+        """
+        with self._lock:
+            query_lock = self._query_locks.setdefault(search_query, threading.Lock())
+        with query_lock:
+            return self._search(topic_id, search_query, not_before)
+
+    def _search(self, topic_id, search_query, not_before):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            cursor = self._cursors.get(topic_id)
+            cached = self._results.get(search_query)
+            if cached is not None and now - cached[0] < self.ttl:
+                self._results.move_to_end(search_query)
+                fetched_at, posts = cached
+                if cursor is not None and cursor >= fetched_at:
+                    return 200, [], fetched_at
+                return 200, self._since(posts, cursor), fetched_at
+
+        # The result is shared by every topic with this query, so it is fetched from not_before, never a topic's cursor
+        response = social_fetch_pool.get(
+            SOCIAL_SEARCH_URL,
+            params={'q': search_query, 'sort': 'top', 'since': not_before.isoformat(), 'limit': 25}
+        )
+        if response.status_code != 200:
+            return response.status_code, [], now
+        posts = response.json().get('posts', [])
+        with self._lock:
+            self._remember(self._results, search_query, (now, posts))
+        return 200, self._since(posts, cursor), now
+
+    @staticmethod
+    def _since(posts, cursor):
+        if cursor is None:
+            return posts
+        return [post for post in posts if post_created_at(post) >= cursor]
+
+    def mark_stored(self, topic_id, fetched_at):
+        """Move the topic's cursor to a result once its posts are committed; a failed store leaves it in place"""
+        with self._lock:
+            if self._cursors.get(topic_id) is None or self._cursors[topic_id] < fetched_at:
+                self._remember(self._cursors, topic_id, fetched_at)
+
+social_search_cache = SocialSearchCache()
+
+# Store a topic's search results as social media posts plus a hashtags insight
+def store_topic_posts(topic, posts):
+    hashtags = []
+    new_posts = []
+    for post in posts:
+        record = post.get('record', {})
+        content = record.get('text', '')
+
+        facets = record.get('facets', [])
+        for facet in facets:
+            feature = facet['features'][0]
+            if feature['$type'] == 'app.bsky.richtext.facet#tag' and 'tag' in feature:
+                hashtag = feature['tag']
+                hashtags.append(hashtag)
+        # print()
+        # print(post)
+        # print()
+        print("Hashtags:" , hashtags, content)
+        created_at = post_created_at(post)
+
+        new_posts.append({
+            'topic_id': topic.id,
+            'content': content,
+            'created_at': created_at,
+            'views': post.get('views', 0),
+            'likes': post.get('likes', 0),
+            'content_hash': social_post_hash(content, created_at)
+        })
+
+    # Posts already stored for the topic hit the unique (topic_id, content_hash) index and are skipped
+    inserted = 0
+    if new_posts:
+        inserted = db.session.execute(
+            sqlite_insert(SocialMediaPost.__table__).on_conflict_do_nothing(index_elements=['topic_id', 'content_hash']),
+            new_posts
+        ).rowcount
+    db.session.commit()
+    logger.info(f"Ingested {inserted} new social media posts for topic: {topic.name}, {len(new_posts) - inserted} duplicates skipped")
+
+    if len(hashtags) > 0:
+        hashtags = list(set(hashtags))
+        insight_content = ', '.join(['#' + k for k in hashtags])
+        hashtags_insight = Insight(topic_id=topic.id, insight_type='hashtags', content=insight_content)
+        db.session.add(hashtags_insight)
+        db.session.commit()
+        logger.info(f"Added hashtags insight {insight_content} for topic {topic.id}")
+
 def ingest_social():
     """Social media ingestion service with improved datetime handling and duplicate prevention."""
     logger.info("Social media ingestion service started.")
@@ -180,76 +497,26 @@ def ingest_social():
                         social_queue.task_done()
                         continue
 
-                    for topic in ranking.topics:
-                        search_query = " ".join(topic.name.split()[:3])
-                        two_days_ago = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
-                        response = requests.get(
-                            'https://public.api.bsky.app/xrpc/app.bsky.feed.searchPosts',
-                            params={'q': search_query, 'sort': 'top', 'since': two_days_ago, 'limit': 25}
-                        )
-                        hashtags = []
-                        if response.status_code == 200:
-                            posts = response.json().get('posts', [])
-                            for post in posts:
-                                record = post.get('record', {})
-                                content = record.get('text', '')
-                                created_at_str = record.get('createdAt')
-
-                                facets = record.get('facets', [])
-                                for facet in facets:
-                                    feature = facet['features'][0]
-                                    if feature['$type'] == 'app.bsky.richtext.facet#tag' and 'tag' in feature:
-                                        hashtag = feature['tag']
-                                        hashtags.append(hashtag)
-                                # print()
-                                # print(post)
-                                # print()
-                                print("Hashtags:" , hashtags, content)
-                                try:
-                                    if created_at_str:
-                                        # Truncate microseconds to 6 digits and ensure proper format
-                                        if '.' in created_at_str:
-                                            base, ms = created_at_str.split('.')
-                                            ms = ms.replace('Z', '')[:6]  # Remove Z and truncate to 6 digits
-                                            created_at_str = f"{base}.{ms}Z"
-                                        created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                                    else:
-                                        created_at = datetime.now(timezone.utc)
-                                except ValueError as e:
-                                    logger.warning(f"Invalid datetime format: {created_at_str}, using current time")
-                                    created_at = datetime.now(timezone.utc)
-
-                                # Check if the post already exists
-                                existing_post = SocialMediaPost.query.filter_by(
-                                    topic_id=topic.id,
-                                    content=content,
-                                    created_at=created_at
-                                ).first()
-
-                                if not existing_post:
-                                    social_post = SocialMediaPost(
-                                        topic_id=topic.id,
-                                        content=content,
-                                        created_at=created_at,
-                                        views=post.get('views', 0),
-                                        likes=post.get('likes', 0)
-                                    )
-                                    db.session.add(social_post)
-                                    logger.info(f"Ingested new social media post for topic: {topic.name}")
-                                else:
-                                    logger.info(f"Duplicate post found, skipping. Topic: {topic.name}")
-                            db.session.commit()
-                            logger.info(f"Ingested social media posts for topic: {topic.name}")
-                        else:
-                            logger.error(f"Failed to fetch posts for topic '{search_query}': {response.status_code}")
-                        
-                        if len(hashtags) > 0:
-                            hashtags = list(set(hashtags))
-                            insight_content = ', '.join(['#' + k for k in hashtags])
-                            hashtags_insight = Insight(topic_id=topic.id, insight_type='hashtags', content=insight_content)
-                            db.session.add(hashtags_insight)
-                            db.session.commit()
-                            logger.info(f"Added hashtags insight {insight_content} for topic {topic.id}")
+                    # Every topic's search runs concurrently; responses are stored here, in completion order
+                    two_days_ago = datetime.now(timezone.utc) - timedelta(days=2)
+                    searches = [(topic.id, topic, " ".join(topic.name.split()[:3])) for topic in ranking.topics]
+                    for (_, topic, search_query), result, error in social_fetch_pool.map_unordered(
+                        lambda search: social_search_cache.search(search[0], search[2], two_days_ago), searches
+                    ):
+                        if error is not None:
+                            logger.error(f"Failed to fetch posts for topic '{search_query}': {error}")
+                            continue
+                        status_code, posts, fetched_at = result
+                        if status_code != 200:
+                            logger.error(f"Failed to fetch posts for topic '{search_query}': {status_code}")
+                            continue
+                        # A failure only loses this topic's posts; its cursor stays put so they are offered again
+                        try:
+                            store_topic_posts(topic, posts)
+                            social_search_cache.mark_stored(topic.id, fetched_at)
+                        except Exception as e:
+                            logger.error(f"Error storing social media posts for topic {topic.id}: {e}")
+                            db.session.rollback()
                 except Exception as e:
                     logger.error(f"Error processing social media posts: {e}")
                     db.session.rollback()
@@ -6,47 +6,52 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
-from common import db_path, init_database, logger
+from common import app, db_path, init_database, migrate_database, logger
 import threading
-import service_ingestion
-import service_ranking
-import service_insights
-import service_api
-import service_diversity
 import sys
 
 # Checks if the database file exists; if not, initialize the database
-if not os.path.exists(db_path):
-    logger.info("Database file not found, initializing database...")
-    init_database()
-else:
-    logger.info("Database file exists.")
+# Called from __main__ only: spawned extraction and embedding workers re-import this module
+def prepare_database():
+    if not os.path.exists(db_path):
+        logger.info("Database file not found, initializing database...")
+        init_database()
+    else:
+        logger.info("Database file exists.")
+        migrate_database()
 
-# Function to start the ingestion service which fetches news articles and clusters similar articles together
+# Function to start the ingestion service which keeps polling news sources and clusters similar articles together
+# Service modules are imported inside each function so --demo only loads what the API needs
 def start_ingestion():
-    service_ingestion.ingest_news()
-    service_ingestion.cluster_articles()
+    import service_ingestion
+    service_ingestion.run_ingestion_scheduler()
 
 # Function to start the topic ranking service
 def start_rank_topics():
+    import service_ranking
     service_ranking.rank_topics()
 
 # Function to start the social media data ingestion service
 def start_ingest_social():
+    import service_ranking
     service_ranking.ingest_social()
 
 # Function to start the insights generation service
 def start_generate_insights():
+    import service_insights
     service_insights.generate_insights()
     
 # Function to initialize source diversity scores
 def initialize_diversity_scores():
+    import service_diversity
     # Calculate diversity scores for topics in the latest ranking
     with app.app_context():
         service_diversity.update_ranked_topics_diversity()
         logger.info("Source diversity scores initialized for ranked topics")
 
 if __name__ == '__main__':
+    prepare_database()
+    import service_api
     # Check for demo mode flag
     if "--demo" in sys.argv:
         print("Demo mode enabled: only running the API service.")
@@ -61,4 +66,5 @@ if __name__ == '__main__':
         threading.Thread(target=initialize_diversity_scores, daemon=True).start()
 
         print("API service running at http://localhost:5000")
-        service_api.app.run(host='0.0.0.0', debug=True)
\ No newline at end of file
+        # The reloader would re-run this block in a second process, starting every service twice
+        service_api.app.run(host='0.0.0.0', debug=True, use_reloader=False)
\ No newline at end of file
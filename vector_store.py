@@ -0,0 +1,272 @@
+from common import app, logger
+import json
+import os
+import shutil
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; the single-writer lock is skipped there
+    fcntl = None
+import threading
+import numpy as np
+
+VECTOR_STORE_PATH = os.path.join(app.instance_path, 'vectors')  # Stored next to news.db
+# Storage precision for new stores: float32, float16 (half the size) or int8 (a quarter, with a per-vector scale).
+# An existing store keeps the precision it was created with.
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float16")
+STORAGE_DTYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+INT8_MAX = 127
+COMPACT_RATIO = 0.25  # Rewrite the files once this fraction of rows has been deleted
+TOMBSTONE = -1
+GENERATION_PREFIX = 'gen-'  # Data directories are named gen-<n>
+DATA_FILES = ('vectors.bin', 'ids.bin', 'scales.bin')
+LOCK_FILE = '.lock'  # flock target held by the one process allowed to write the store
+ID_BYTES = np.dtype(np.int64).itemsize
+SCALE_BYTES = np.dtype(np.float32).itemsize
+
+# Persistent vector store: an append-only memory-mapped matrix plus a parallel file of IDs
+class VectorStore:
+
+    def __init__(self, path=VECTOR_STORE_PATH, dtype=VECTOR_STORE_DTYPE):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, 'meta.json')
+        self._lock = threading.RLock()
+        self._lock_file = self._acquire_process_lock()
+
+        self.dim = None
+        self.dtype = dtype
+        # Data files live in a generation directory named by meta.json, so compaction can switch atomically.
+        # Stores written before compaction was crash-safe keep their files directly in path (generation None).
+        self.generation = 0
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta['dim']
+            # Stores written before precision was configurable are float32
+            self.dtype = meta.get('dtype', 'float32')
+            self.generation = meta.get('generation')
+        if self.dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported vector store dtype {self.dtype}, expected one of {list(STORAGE_DTYPES)}")
+        self._use_generation(self.generation)
+        os.makedirs(self._data_path, exist_ok=True)
+        self._remove_stale_generations()
+
+        # Row of every live ID; deleted rows stay in the files as tombstones until compaction
+        self._positions = {}
+        self._rows = self._repair()
+        ids = self._read_ids()
+        for row, vector_id in enumerate(ids):
+            if vector_id != TOMBSTONE:
+                self._positions[int(vector_id)] = row
+        logger.info(f"Vector store at {path} loaded with {len(self._positions)} {self.dtype} vectors")
+
+    def _acquire_process_lock(self):
+        """
+        Hold an exclusive flock on the store for the life of this object. Rows and positions are tracked
+        in memory, so a second writing process would overwrite rows or compact away a live generation.
+        """
+        lock_file = open(os.path.join(self.path, LOCK_FILE), 'a')
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(f"Vector store at {self.path} is already open for writing elsewhere, only one process may use it")
+        return lock_file
+
+    def close(self):
+        """Release the process lock; the store must not be used afterwards"""
+        with self._lock:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _use_generation(self, generation):
+        self.generation = generation
+        self._data_path = self.path if generation is None else os.path.join(self.path, f'{GENERATION_PREFIX}{generation}')
+        self._vectors_path = os.path.join(self._data_path, 'vectors.bin')
+        self._ids_path = os.path.join(self._data_path, 'ids.bin')
+        self._scales_path = os.path.join(self._data_path, 'scales.bin')  # int8 stores only
+
+    def _write_meta(self):
+        tmp_path = self._meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'dim': self.dim, 'dtype': self.dtype, 'generation': self.generation}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._meta_path)
+
+    def _remove_stale_generations(self):
+        # Left behind by a compaction that crashed before or after switching meta.json
+        for name in os.listdir(self.path):
+            stale = os.path.join(self.path, name)
+            if name.startswith(GENERATION_PREFIX) and stale != self._data_path:
+                shutil.rmtree(stale, ignore_errors=True)
+        if self.generation is not None:
+            for name in DATA_FILES:
+                if os.path.exists(os.path.join(self.path, name)):
+                    os.remove(os.path.join(self.path, name))
+
+    def _row_bytes(self):
+        return (self.dim or 0) * np.dtype(STORAGE_DTYPES[self.dtype]).itemsize
+
+    def _repair(self):
+        """
+        Truncate every data file to the rows all of them hold completely and return that row count.
+        An interrupted add can leave vectors or scales without IDs (IDs are written last) or a partial ID.
+        """
+        sizes = [(self._ids_path, ID_BYTES)]
+        if self.dim:
+            sizes.append((self._vectors_path, self._row_bytes()))
+            if self.dtype == 'int8':
+                sizes.append((self._scales_path, SCALE_BYTES))
+        file_sizes = {path: os.path.getsize(path) if os.path.exists(path) else 0 for path, _ in sizes}
+        rows = min(file_sizes[path] // row_bytes for path, row_bytes in sizes)
+        for path, row_bytes in sizes:
+            if file_sizes[path] > rows * row_bytes:
+                logger.warning(f"Truncating {path} from {file_sizes[path]} to {rows * row_bytes} bytes after an interrupted write")
+                os.truncate(path, rows * row_bytes)
+        return rows
+
+    def _read_ids(self):
+        if self._rows == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.fromfile(self._ids_path, dtype=np.int64, count=self._rows)
+
+    def _matrix(self):
+        """Read-only memory map over every stored row in storage precision, tombstones included"""
+        storage_dtype = STORAGE_DTYPES[self.dtype]
+        if self._rows == 0:
+            return np.empty((0, self.dim or 0), dtype=storage_dtype)
+        return np.memmap(self._vectors_path, dtype=storage_dtype, mode='r', shape=(self._rows, self.dim))
+
+    def _scales(self):
+        if self._rows == 0:
+            return np.empty(0, dtype=np.float32)
+        return np.memmap(self._scales_path, dtype=np.float32, mode='r', shape=(self._rows,))
+
+    def _encode(self, vectors):
+        """Convert float vectors to storage precision, returning (data, per-vector scales or None)"""
+        if self.dtype != 'int8':
+            return vectors.astype(STORAGE_DTYPES[self.dtype]), None
+        scales = np.abs(vectors).max(axis=1) / INT8_MAX
+        scales[scales == 0] = 1
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -INT8_MAX, INT8_MAX).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _decode(self, data, rows):
+        # float32 and float16 rows are returned as stored; int8 rows are scaled back to float32
+        if self.dtype != 'int8':
+            return data
+        return data.astype(np.float32) * self._scales()[rows][:, None]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, vector_id):
+        return vector_id in self._positions
+
+    def nbytes(self):
+        """Bytes used by the live vectors in storage precision"""
+        per_vector = self._row_bytes()
+        if self.dtype == 'int8':
+            per_vector += SCALE_BYTES
+        return len(self._positions) * per_vector
+
+    def ids(self):
+        with self._lock:
+            return list(self._positions)
+
+    def add(self, ids, vectors):
+        """Append vectors; an ID that is already stored is replaced"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = [int(vector_id) for vector_id in ids]
+        if not ids:
+            return
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} IDs for {len(vectors)} vectors")
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._write_meta()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+
+            self.delete([vector_id for vector_id in ids if vector_id in self._positions])
+            data, scales = self._encode(vectors)
+            # Written at the offset of the first new row, so bytes left by a failed add are overwritten.
+            # IDs go last: rows only count once their IDs are on disk.
+            _write_at(self._vectors_path, self._rows * self._row_bytes(), data)
+            if scales is not None:
+                _write_at(self._scales_path, self._rows * SCALE_BYTES, scales)
+            _write_at(self._ids_path, self._rows * ID_BYTES, np.asarray(ids, dtype=np.int64))
+            for offset, vector_id in enumerate(ids):
+                self._positions[vector_id] = self._rows + offset
+            self._rows += len(ids)
+
+    def delete(self, ids):
+        with self._lock:
+            rows = [self._positions.pop(int(vector_id)) for vector_id in ids if int(vector_id) in self._positions]
+            if not rows:
+                return
+            stored_ids = np.memmap(self._ids_path, dtype=np.int64, mode='r+', shape=(self._rows,))
+            stored_ids[rows] = TOMBSTONE
+            stored_ids.flush()
+            del stored_ids
+            if self._rows - len(self._positions) > COMPACT_RATIO * self._rows:
+                self._compact()
+
+    def _compact(self):
+        """Write the live rows to a new generation directory, then switch meta.json to it atomically"""
+        rows = sorted(self._positions.values())
+        ids = self._read_ids()[rows]
+        # Rows are copied in storage precision, so compaction never re-quantizes
+        files = [('vectors.bin', np.array(self._matrix()[rows])), ('ids.bin', ids)]
+        if self.dtype == 'int8':
+            files.append(('scales.bin', np.array(self._scales()[rows])))
+        previous = self._data_path
+        generation = (self.generation or 0) + 1
+        target = os.path.join(self.path, f'{GENERATION_PREFIX}{generation}')
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(target)
+        for name, data in files:
+            with open(os.path.join(target, name), 'wb') as f:
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        # Until meta.json is replaced a crash leaves the previous generation in use
+        self._use_generation(generation)
+        self._write_meta()
+        if previous == self.path:
+            for name in DATA_FILES:
+                if os.path.exists(os.path.join(previous, name)):
+                    os.remove(os.path.join(previous, name))
+        else:
+            shutil.rmtree(previous, ignore_errors=True)
+        self._positions = {int(vector_id): row for row, vector_id in enumerate(ids)}
+        self._rows = len(ids)
+        logger.info(f"Vector store compacted to {self._rows} vectors (generation {self.generation})")
+
+    def get(self, ids=None):
+        """
+        Return (ids, matrix) for the given IDs, or for every stored vector when ids is None.
+        Without deletions the full float32/float16 matrix is the memory map itself, so nothing is copied.
+        """
+        with self._lock:
+            matrix = self._matrix()
+            if ids is None:
+                if len(self._positions) == self._rows:
+                    return self._read_ids().tolist(), self._decode(matrix, slice(None))
+                rows = sorted(self._positions.values())
+                return self._read_ids()[rows].tolist(), self._decode(matrix[rows], rows)
+            found = [int(vector_id) for vector_id in ids if int(vector_id) in self._positions]
+            rows = [self._positions[vector_id] for vector_id in found]
+            return found, self._decode(matrix[rows], rows)
+
+# Write data at a byte offset, creating the file if needed and dropping anything past the written range
+def _write_at(path, offset, data):
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(offset)
+        f.write(data.tobytes())
+        f.truncate()